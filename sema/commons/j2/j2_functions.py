@@ -1,14 +1,17 @@
 import re
+from collections import OrderedDict
 from collections.abc import Iterable
 from datetime import date, datetime
+from functools import lru_cache
 from logging import getLogger
 from math import isfinite
-from typing import Any
+from typing import Any, Callable
 
 import jinja2
 from dateutil import parser
 from jinja2 import pass_context
 from jinja2.runtime import Context
+from jinja2.utils import missing
 from uritemplate import URITemplate
 
 from sema.commons.clean import clean_uri_str
@@ -16,9 +19,54 @@ from sema.commons.clean.clean import check_valid_uri
 
 log = getLogger(__name__)
 
+# max number of maps kept in a cache of built maps
+MAP_CACHE_SIZE: int = 32
+# max number of compiled uri-templates kept
+URITEMPLATE_CACHE_SIZE: int = 1024
+# max number of compiled xsd formatters (per type_name and quote) kept
+XSD_FORMATTER_CACHE_SIZE: int = 256
+# quotes accepted around xsd formatted values
+XSD_QUOTES: tuple = ("'", '"')
+
+
+class LRUCache:
+    """Dict-like cache holding at most maxsize entries,
+    evicting the least recently used ones beyond that."""
+
+    def __init__(self, maxsize: int = MAP_CACHE_SIZE) -> None:
+        assert maxsize > 0, "cache maxsize should be positive"
+        self._maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"LRUCache({len(self)}/{self._maxsize})"
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, key: Any) -> Any:
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __setitem__(self, key: Any, val: Any) -> None:
+        self._data[key] = val
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return self[key] if key in self._data else default
+
+    def clear(self) -> None:
+        self._data.clear()
+
 
 class Functions:
-    _cache = dict()
+    # fallback cache for map_build, when not given a (run-scoped) one
+    _cache = LRUCache()
 
     @staticmethod
     def all():
@@ -169,37 +217,63 @@ def xsd_format_uri(content: str, quote: str, *_: Any) -> str:
     return xsd_value(uri, quote, "xsd:anyURI")
 
 
-def xsd_format_string(content: str, quote: str, suffix: str) -> str:
-    if isinstance(content, (list, dict, type(None), jinja2.runtime.Undefined)):
-        raise TypeError(
-            f"unsupported input type {type(content)} for boolean formatting - "
-            "conversion required before format call"
-        )
-    # apply escape sequences: \ to \\ and quote to \quote
-    escqt = f"\\{quote}"
-    content = str(content).replace("\\", "\\\\").replace(quote, escqt)
-
-    if "\n" in content:
-        quote = quote * 3  # make long quote variant to allow for newlines
-        assert quote not in content, (
+@lru_cache(maxsize=XSD_FORMATTER_CACHE_SIZE)
+def _string_formatter(quote: str, suffix: str | None) -> Callable:
+    """Compiles the string formatter for the quote and suffix"""
+    # escape sequences: \ to \\ and quote to \quote
+    escapes = str.maketrans({"\\": "\\\\", quote: f"\\{quote}"})
+    long_quote = quote * 3  # long quote variant to allow for newlines
+    if suffix is None:
+        suffix = "^^xsd:string"
+
+    def format_string(content: str, *_: Any) -> str:
+        if isinstance(
+            content, (list, dict, type(None), jinja2.runtime.Undefined)
+        ):
+            raise TypeError(
+                f"unsupported input type {type(content)} for string "
+                "formatting - conversion required before format call"
+            )
+        content = str(content).translate(escapes)
+        if "\n" not in content:
+            return quote + content + quote + suffix
+        assert long_quote not in content, (
             "ttl format error: still having "
-            f"quote {quote} in text content {content}"
-            f"applied quote format {quote} in text content"
+            f"quote {long_quote} in text content {content}"
+            f"applied quote format {long_quote} in text content"
         )
-    return xsd_value(content, quote, "xsd:string", suffix)
+        return long_quote + content + long_quote + suffix
+
+    return format_string
+
+
+def xsd_format_string(content: str, quote: str, suffix: str) -> str:
+    return _string_formatter(quote, suffix)(content)
+
+
+# date patterns recognised in strings by auto formatting, tried in order
+#   with the formatter to apply, and the conversion of the parsed value
+#   to pass it (None to pass the original string)
+AUTO_DATE_FORMATS: list = [
+    (
+        re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"),
+        xsd_format_datetime,
+        lambda parsed: parsed,
+    ),
+    (re.compile(r"\d{4}-\d{2}-\d{2}"), xsd_format_date, datetime.date),
+    (re.compile(r"\d{4}-\d{2}"), xsd_format_gyearmonth, None),
+    (re.compile(r"\d{4}"), xsd_format_gyear, None),
+]
 
 
 def _auto_str_to_formatted_date(content: str, quote: str) -> str | None:
-    for regex, formatter in [
-        (r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}", xsd_format_datetime),
-        (r"\d{4}-\d{2}-\d{2}", xsd_format_date),
-        (r"\d{4}-\d{2}", xsd_format_gyearmonth),
-        (r"\d{4}", xsd_format_gyear),
-    ]:
-        if re.match(regex, content):
+    for regex, formatter, convert in AUTO_DATE_FORMATS:
+        if regex.match(content):
             try:
-                parser.isoparse(content)
-                return formatter(content, quote)
+                parsed = parser.isoparse(content)
+                # avoid parsing the content again in the formatter
+                value = convert(parsed) if convert else content
+                return formatter(value, quote)
             except ValueError:
                 pass
     return None
@@ -275,23 +349,26 @@ def xsd_auto_format_any(content: Any, quote: str, *_: Any) -> str:
     # -- special case for empty and whitespace-only strings
     if isinstance(content, str) and len(content.strip()) == 0:
         return xsd_format_string(content, quote, None)
+    text = str(content)
     # 6. string parseable to exact bool true or false (ignoring case)
-    if str(content).strip().lower() in ["true", "false"]:
+    if text.strip().lower() in ["true", "false"]:
         return xsd_format_boolean(content, quote)
     # 7. string parseable to int
     # 8. string parseable to float
-    formatted_number = _auto_str_to_formatted_number(str(content), quote)
+    formatted_number = _auto_str_to_formatted_number(text, quote)
     if formatted_number is not None:
         return formatted_number
     # 9. string parseable to datetime
     # 10. string parseable to date
     # 11. string matching [-]?YYYY-MM for gyearmonth
     # 12. string matching [-]?YYYY for gyear
-    formatted_date = _auto_str_to_formatted_date(str(content), quote)
+    formatted_date = _auto_str_to_formatted_date(text, quote)
     if formatted_date is not None:
         return formatted_date
     # 13. string is valid uri
-    if check_valid_uri(clean_uri_str(str(content))):
+    #   (urls and urns all have a scheme ending in ':' -- cleaning keeps it
+    #   so the costly validation can be skipped for all other text)
+    if ":" in text and check_valid_uri(clean_uri_str(text)):
         return xsd_format_uri(content, quote)
     # 14. remaining string content
     return xsd_format_string(content, quote, None)
@@ -319,10 +396,11 @@ XSD_FMT_TYPE_FN = {
 }
 
 
-def xsd_format(
-    content: Any, type_name: str, quote: str = "'", *, fb: str = None
-) -> str:
-    assert quote in "'\"", "ttl format only accepts ' or \" as valid quotes."
+@lru_cache(maxsize=XSD_FORMATTER_CACHE_SIZE)
+def compiled_xsd_formatter(type_name: str, quote: str) -> Callable:
+    """The function formatting content to the type_name with the quote,
+    resolving the type_name (case, xsd: prefix, language tags) only once"""
+    assert quote in XSD_QUOTES, "ttl format only accepts ' or \" as quotes."
 
     suffix = None
     type_name = type_name.lower()
@@ -338,23 +416,35 @@ def xsd_format(
             type_name = "xsd:" + type_name
 
         # second try
-        type_format_fn = XSD_FMT_TYPE_FN.get(type_name.lower(), None)
+        type_format_fn = XSD_FMT_TYPE_FN.get(type_name, None)
         assert type_format_fn is not None, (
             "type_name '%s' not supported." % type_name
         )
 
-    val = fb
+    if type_format_fn is xsd_format_string:
+        return _string_formatter(quote, suffix)
+
+    def format_content(content: Any) -> str:
+        return type_format_fn(content, quote, suffix)
+
+    return format_content
+
+
+def xsd_format(
+    content: Any, type_name: str, quote: str = "'", *, fb: str = None
+) -> str:
+    format_fn = compiled_xsd_formatter(type_name, quote)
+    if fb is None:
+        return format_fn(content)
     try:
-        val = type_format_fn(content, quote, suffix)
+        return format_fn(content)
     except Exception as e:
-        if fb is None:
-            raise e
         log.warning(
             f"formatting of content '{content}' "
             f"with type '{type_name}' failed: {e}, "
             f"using fallback value '{fb}'"
         )
-    return val
+    return fb
 
 
 def uri_format(uri: str) -> str:
@@ -362,16 +452,26 @@ def uri_format(uri: str) -> str:
     return f"<{uri}>"
 
 
+@lru_cache(maxsize=URITEMPLATE_CACHE_SIZE)
+def compiled_uritemplate(template: str) -> URITemplate:
+    return URITemplate(template)
+
+
 @pass_context
 def uritexpand(
     j2ctx: Context,
     template: str,
     context: dict | None = None,
 ) -> str:
-    context = context or {
-        k: v for k, v in j2ctx.get_all().items() if not callable(v)
-    }
-    return URITemplate(template).expand(context)
+    urit = compiled_uritemplate(template)
+    if not context:
+        # only resolve the variables the template actually uses
+        context = dict()
+        for name in urit.variable_names:
+            val = j2ctx.resolve_or_missing(name)
+            if val is not missing and not callable(val):
+                context[name] = val
+    return urit.expand(context)
 
 
 def regexreplace(find: str, replace: str, text: str) -> str:
@@ -406,11 +506,14 @@ def map_build(
     key_name: str,
     val_name: str | None = None,
     cached_as: str | None = None,
+    *,
+    cache: LRUCache | None = None,
 ) -> ValueMapper:
     assert key_name, "cannot build map without valid key-name"
+    cache = cache if cache is not None else Functions._cache
     # note: id val_name is None, we just map to the whole record
-    if cached_as is not None and cached_as in Functions._cache:
-        return Functions._cache[cached_as]
+    if cached_as is not None and cached_as in cache:
+        return cache[cached_as]
     # else - make map
     vmap = ValueMapper()
     # - populate it
@@ -419,7 +522,7 @@ def map_build(
         vmap.add(item[key_name], target)
     # add it to the cache
     if cached_as is not None:
-        Functions._cache[cached_as] = vmap
+        cache[cached_as] = vmap
     return vmap
 
 
@@ -1,13 +1,49 @@
 import logging
+import os
+from functools import partial
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader, meta
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    meta,
+    nodes,
+)
 
 from .exceptions import NoTemplateFolder
-from .j2_functions import Filters, Functions
+from .j2_functions import Filters, Functions, LRUCache, map_build
 from .rdf_syntax_builder import RDFSyntaxBuilder
 
 log = logging.getLogger(__name__)
 
+# env variable to opt-in for a persistent bytecode cache in the given folder
+BYTECODE_CACHE_ENV: str = "SEMA_J2_BYTECODE_CACHE"
+
+
+def sema_version() -> str:
+    try:
+        return version("pysema")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class VersionedBytecodeCache(FileSystemBytecodeCache):
+    """Jinja FileSystemBytecodeCache that keys the compiled templates by
+    their file path and the version of sema.
+    (Jinja itself already invalidates on source and jinja version changes,
+    replacing the entry under the same key, so edits leave no stale files)
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        super().__init__(str(directory))
+        self._version = sema_version()
+
+    def get_cache_key(self, name: str, filename: str | None = None) -> str:
+        return super().get_cache_key(f"{name}|{self._version}", filename)
+
 
 class J2RDFSyntaxBuilder(RDFSyntaxBuilder):
     """
@@ -18,6 +54,8 @@ class J2RDFSyntaxBuilder(RDFSyntaxBuilder):
         templates
     :param extra_filters: jinja2 custom filters to apply on templates.
     :param extra_functions: jinja2 custom functions to apply on templates.
+    :param bytecode_cache_dir: folder to persist the compiled templates in,
+        defaults to the SEMA_J2_BYTECODE_CACHE env variable (no cache if unset)
     """
 
     def __init__(
@@ -26,15 +64,27 @@ class J2RDFSyntaxBuilder(RDFSyntaxBuilder):
         extra_filters={},
         extra_functions={},
         jinja_env_variables={},
+        bytecode_cache_dir: str | Path | None = None,
     ):
         if not templates_folder:
             raise NoTemplateFolder
+        bytecode_cache_dir = bytecode_cache_dir or os.getenv(
+            BYTECODE_CACHE_ENV
+        )
+        if bytecode_cache_dir and "bytecode_cache" not in jinja_env_variables:
+            jinja_env_variables = dict(
+                jinja_env_variables,
+                bytecode_cache=VersionedBytecodeCache(bytecode_cache_dir),
+            )
         self._templates_env = Environment(
             loader=FileSystemLoader(templates_folder), **jinja_env_variables
         )
 
         filters: dict = Filters.all()
         functions: dict = Functions.all()
+        # maps built with cached_as are kept per builder, not globally
+        self._cache = LRUCache()
+        functions["map"] = partial(map_build, cache=self._cache)
         if extra_filters:
             filters.update(extra_filters)
         if extra_functions:
@@ -42,6 +92,11 @@ class J2RDFSyntaxBuilder(RDFSyntaxBuilder):
         self._templates_env.filters.update(filters)
         self._templates_env.globals.update(functions)
 
+    def reset_cache(self) -> None:
+        """Drops the content cached by the template functions
+        (e.g. to start a new run with fresh maps)"""
+        self._cache.clear()
+
     def _get_rdfsyntax_template(self, name: str):
         """Gets the template"""
         return self._templates_env.get_template(name)
@@ -66,6 +121,59 @@ class J2RDFSyntaxBuilder(RDFSyntaxBuilder):
         ast = self._templates_env.parse(*template_source)  # type: ignore
         return meta.find_undeclared_variables(ast)
 
+    def fields_in_template(self, name: str, var_name: str = "_") -> set | None:
+        """
+        The set of fields the template reads from the var_name variable,
+        i.e. through ``_.field`` or ``_['field']``
+
+        :param name: name of the template to inspect
+        :param var_name: name of the variable holding the record
+        :returns: set of field-names, or None if any field could be needed
+            (e.g. when the variable is used as a whole, with a computed
+            key, or when the template includes or imports other templates)
+        :rtype: set of str | None
+        """
+        templates_env = self._templates_env
+        if templates_env.loader is None:
+            raise ValueError("The template loader is not set.")
+        source = templates_env.loader.get_source(templates_env, name)
+        ast = templates_env.parse(*source)  # type: ignore
+        if any(ast.find_all((nodes.Extends, nodes.Include, nodes.Import))):
+            return None
+        if any(ast.find_all(nodes.FromImport)):
+            return None
+
+        fields: set = set()
+
+        def is_var(node) -> bool:
+            return isinstance(node, nodes.Name) and node.name == var_name
+
+        def collect(node) -> bool:
+            """adds the fields read below node, False if the var is used
+            in any other way"""
+            if (
+                isinstance(node, nodes.Call)
+                and isinstance(node.node, nodes.Getattr)
+                and is_var(node.node.node)
+            ):
+                return False  # calling methods on it, e.g. _.items()
+            if isinstance(node, nodes.Getattr) and is_var(node.node):
+                fields.add(node.attr)
+                return True
+            if (
+                isinstance(node, nodes.Getitem)
+                and is_var(node.node)
+                and isinstance(node.arg, nodes.Const)
+                and isinstance(node.arg.value, str)
+            ):
+                fields.add(node.arg.value)
+                return True
+            if is_var(node):
+                return False
+            return all(collect(child) for child in node.iter_child_nodes())
+
+        return fields if collect(ast) else None
+
     def build_syntax(
         self,
         _template_name: str,
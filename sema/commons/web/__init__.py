@@ -2,6 +2,7 @@ from .conneg import ConnegEvaluation, FoundVariants
 from .download_to_file import download_to_file, save_web_content
 from .httpsession import make_http_session
 from .parse_headers import get_parsed_header, parse_header
+from .webcache import CachedResource, WebCache
 
 __all__ = [
     "make_http_session",
@@ -11,4 +12,6 @@ __all__ = [
     "save_web_content",
     "get_parsed_header",
     "parse_header",
+    "WebCache",
+    "CachedResource",
 ]
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from email.utils import parsedate_to_datetime
+from hashlib import sha256
+from pathlib import Path
+
+from requests import RequestException, Session
+
+from .httpsession import make_http_session
+from .parse_headers import get_parsed_header, parse_header
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+
+
+def default_cache_dir() -> Path:
+    """The default location of the web cache
+    (following the XDG base directory convention)"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "sema" / "web"
+
+
+def http_date_to_timestamp(value: str | None) -> float | None:
+    """Converts a http-date header value (e.g. Last-Modified) to a timestamp"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        log.warning(f"ignoring unparseable http-date '{value}'")
+        return None
+
+
+class CachedResource:
+    """Describes a web resource as it is available in the local cache"""
+
+    def __init__(self, path: Path, meta: dict) -> None:
+        self.path: Path = path
+        self.url: str = meta["url"]
+        self.mime: str | None = meta.get("mime")
+        self.filename: str | None = meta.get("filename")
+        self.etag: str | None = meta.get("etag")
+        self.last_modified: str | None = meta.get("last_modified")
+        # the moment the content was last changed
+        self.mtime: float = meta["mtime"]
+
+    def __repr__(self) -> str:
+        return f"CachedResource('{self.url}', '{self.path}')"
+
+
+class WebCache:
+    """Local on-disk cache of web resources, keyed by their url.
+    Cached content is revalidated through conditional GET requests using
+    the ETag and Last-Modified validators of the previous response.
+    Content is streamed to disk, never held in memory completely.
+
+    :param cache_dir: folder to keep the cached files in
+        defaults to ``default_cache_dir()``
+    :param session: the http session to use
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        session: Session | None = None,
+    ) -> None:
+        self._dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._session = session
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            self._session = make_http_session()
+        return self._session
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = sha256(url.encode("utf-8")).hexdigest()
+        return self._dir / key, self._dir / f"{key}.json"
+
+    def cached(self, url: str) -> CachedResource | None:
+        """The cached version of the url if any, without revalidation"""
+        path, meta_path = self._paths(url)
+        if not (path.exists() and meta_path.exists()):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return CachedResource(path, json.load(f))
+
+    def fetch(self, url: str, headers: dict = {}) -> CachedResource:
+        """Makes sure the cache holds the current content for the url
+
+        :param url: the url to fetch
+        :param headers: extra request headers to send
+        :returns: the resource as it is available in the cache
+        :raises RequestException: if the content could not be fetched and
+            no cached version is available
+        """
+        current = self.cached(url)
+        request_headers = dict(headers)
+        if current is not None:
+            if current.etag:
+                request_headers["If-None-Match"] = current.etag
+            if current.last_modified:
+                request_headers["If-Modified-Since"] = current.last_modified
+        try:
+            with self.session.get(
+                url, headers=request_headers, stream=True
+            ) as response:
+                if response.status_code == 304 and current is not None:
+                    log.debug(f"cached content for {url} is still valid")
+                    return current
+                response.raise_for_status()
+                return self._store(url, response)
+        except RequestException as e:
+            if current is None:
+                raise
+            log.warning(f"using stale cached content for {url}: {e}")
+            return current
+
+    def _store(self, url: str, response) -> CachedResource:
+        path, meta_path = self._paths(url)
+        # stream into a temp file first, only replace the cache when complete
+        with tempfile.NamedTemporaryFile(
+            dir=self._dir, prefix=".part-", delete=False
+        ) as tmp:
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+
+        last_modified = response.headers.get("Last-Modified")
+        cdisp = response.headers.get("Content-Disposition")
+        meta = {
+            "url": url,
+            "mime": get_parsed_header(response.headers, "Content-Type")[0],
+            "filename": (
+                parse_header(cdisp, "content-disposition")[1].get("filename")
+                if cdisp
+                else None
+            ),
+            "etag": response.headers.get("ETag"),
+            "last_modified": last_modified,
+            "mtime": http_date_to_timestamp(last_modified) or time.time(),
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        log.debug(f"cached content for {url} at {path}")
+        return CachedResource(path, meta)
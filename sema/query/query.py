@@ -200,6 +200,21 @@ QueryResult.register(DFBasedQueryResult)
 QueryResult.register(SPARQLQueryResult)
 
 
+def result_rows(result: Result) -> Generator:
+    """
+    Yields the rows of an rdflib query result one by one,
+        as dicts of python values (None for unbound variables)
+
+    :param result: the rdflib query result
+    """
+    names = [str(var) for var in result.vars]  # type: ignore
+    for row in result:
+        yield {
+            name: None if x is None else x.toPython()
+            for name, x in zip(names, row)  # type: ignore
+        }
+
+
 class GraphSource(ABC):
     @abstractmethod
     def query(self, sparql: str) -> QueryResult:
@@ -210,6 +225,15 @@ class GraphSource(ABC):
         """
         pass  # pragma: no cover
 
+    def rows(self, sparql: str) -> Iterable[dict]:
+        """
+        Function that queries data with the given sparql,
+            providing the result rows as dicts one by one.
+
+        :param sparql: sparql statement logic for querying data.
+        """
+        return self.query(sparql).to_list()
+
     registry = set()
 
     @staticmethod
@@ -297,6 +321,10 @@ class MemoryGraphSource(GraphSource):
         result = self.graph.query(sparql)
         return QueryResult.build(result, query=sparql)  # type: ignore
 
+    def rows(self, sparql: str) -> Iterable[dict]:
+        log.debug(f"executing sparql {sparql}")
+        return result_rows(self.graph.query(sparql))  # type: ignore
+
     @staticmethod
     def check_compatibility(*graph):
         return isinstance(graph[-1], Graph)
@@ -337,6 +365,10 @@ class SPARQLGraphSource(GraphSource):
         result: Result = store.select(sparql)
         return QueryResult.build(result, query=sparql)  # type: ignore
 
+    def rows(self, sparql: str) -> Iterable[dict]:
+        store: RDFStore = URIRDFStore(self.endpoint)
+        return result_rows(store.select(sparql))
+
     @staticmethod
     def check_compatibility(*sources):
         source_type = GraphSource.detect_source_type(*sources)
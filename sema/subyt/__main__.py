@@ -4,6 +4,7 @@ from logging import getLogger
 
 from sema.commons.cli import Namespace, SemaArgsParser
 from sema.subyt import Subyt
+from sema.subyt.sinks import ShardFileSink
 
 log = getLogger(__name__)
 
@@ -22,8 +23,10 @@ def get_arg_parser() -> SemaArgsParser:
         "-n",
         "--name",
         action="store",
-        required=True,
-        help="Speficies the name of the template to use",
+        help=(
+            "Speficies the name of the template to use. "
+            "Required unless --target is used."
+        ),
     )
 
     parser.add_argument(
@@ -73,9 +76,13 @@ def get_arg_parser() -> SemaArgsParser:
     parser.add_argument(
         "-o",
         "--output",
-        metavar="FILE|PATTERN",  # meaning of the argument
+        metavar="FILE|PATTERN|STORE",  # meaning of the argument
         action="store",
-        help="Specifies where to write the output, can use {uritemplate}.",
+        help=(
+            "Specifies where to write the output, can use {uritemplate}. "
+            "Use sparql+<endpoint>#<named-graph> to insert the output "
+            "directly into a triple store."
+        ),
     )
 
     parser.add_argument(
@@ -90,6 +97,17 @@ def get_arg_parser() -> SemaArgsParser:
         ),
     )
 
+    parser.add_argument(
+        "--dedupe",
+        metavar="KIND",  # meaning of the argument
+        action="store",
+        help=(
+            "How --unique keeps the values seen: memory (default) or disk "
+            "for exact filtering, bloom[:capacity] for approximate "
+            "filtering in little memory."
+        ),
+    )
+
     parser.add_argument(
         "-f",
         "--force",
@@ -131,11 +149,179 @@ def get_arg_parser() -> SemaArgsParser:
         help=("Execute only when input has been updated. Abort otherwise."),
     )
 
+    parser.add_argument(
+        "--incremental",
+        default=False,
+        action="store_true",
+        help=(
+            "Only render records that changed since the previous run. "
+            "Only applies to patterned output."
+        ),
+    )
+
+    parser.add_argument(
+        "--prune",
+        default=False,
+        action="store_true",
+        help=(
+            "With --incremental, remove output files "
+            "of records no longer in the input."
+        ),
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        metavar="N",  # meaning of the argument
+        type=int,
+        default=1,
+        action="store",
+        help=(
+            "Number of worker processes rendering records in parallel. "
+            "Only applies in iteration mode."
+        ),
+    )
+
+    parser.add_argument(
+        "--writers",
+        metavar="N",  # meaning of the argument
+        type=int,
+        default=0,
+        action="store",
+        help=(
+            "Number of background threads writing output files. "
+            "Only applies to patterned output."
+        ),
+    )
+
+    parser.add_argument(
+        "--archive",
+        metavar="FILE",  # meaning of the argument
+        action="store",
+        help=(
+            "Pack the output files in this tar or zip archive "
+            "(.tar, .tar.gz, .tgz, .tar.bz2, .tar.xz or .zip). "
+            "Only applies to patterned output."
+        ),
+    )
+
+    parser.add_argument(
+        "--rotate-records",
+        metavar="N",  # meaning of the argument
+        type=int,
+        default=0,
+        action="store",
+        help=(
+            "Move to a next output file after N records. "
+            "Requires an output name with a {part} pattern."
+        ),
+    )
+
+    parser.add_argument(
+        "--rotate-bytes",
+        metavar="N",  # meaning of the argument
+        type=int,
+        default=0,
+        action="store",
+        help=(
+            "Move to a next output file after N (uncompressed) bytes. "
+            "Requires an output name with a {part} pattern."
+        ),
+    )
+
+    parser.add_argument(
+        "--batch",
+        metavar="N",  # meaning of the argument
+        type=int,
+        default=0,
+        action="store",
+        help=(
+            "Render N records per template call, as _batch. "
+            "Only applies in iteration mode, not to patterned output "
+            "nor with --rotate-records."
+        ),
+    )
+
+    parser.add_argument(
+        "--target",
+        nargs="+",
+        metavar=("NAME", "OUTPUT [MODE]"),  # meaning of those arguments
+        action="append",  # multiple --target can be combined
+        help=(
+            "Also applies template NAME to the same input, writing to "
+            "OUTPUT, in MODE (defaults to --mode). "
+            "Multiple entries render all in one pass over the input."
+        ),
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        metavar="N",  # meaning of the argument
+        type=int,
+        default=0,
+        action="store",
+        help=(
+            "Save the progress every N records, so an interrupted run "
+            "can be resumed. Only applies in iteration mode, to a single "
+            "(uncompressed) output file or to patterned output."
+        ),
+    )
+
+    parser.add_argument(
+        "--resume",
+        default=False,
+        action="store_true",
+        help=(
+            "Continue from the last checkpoint of an interrupted run, "
+            "overwriting the output it left. Implies --checkpoint."
+        ),
+    )
+
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",  # meaning of the argument
+        action="store",
+        help=(
+            "Only process shard I (counting from 0) out of N of the input, "
+            "so N processes together produce the output. "
+            "An output file is then written as a part, see --merge-shards."
+        ),
+    )
+
+    parser.add_argument(
+        "--shard-key",
+        metavar="PATTERN",  # meaning of the argument
+        action="store",
+        help=(
+            "Decides the shard of each record by the hash of this "
+            "{uritemplate} pattern, rather than by its index. "
+            "Defaults to the --unique pattern if any."
+        ),
+    )
+
+    parser.add_argument(
+        "--merge-shards",
+        metavar="N",  # meaning of the argument
+        type=int,
+        default=0,
+        action="store",
+        help=(
+            "Merges the parts written by N shards into the output file, "
+            "rather than processing a template."
+        ),
+    )
+
     return parser
 
 
 def make_service(args: Namespace) -> Subyt:
     """Make the service with the passed args"""
+    targets = args.target or []
+    for target in targets:
+        if len(target) not in (2, 3):
+            raise ValueError(f"--target {target} needs NAME OUTPUT [MODE]")
+    if not args.name and not targets:
+        raise ValueError("either --name or --target is required")
     return Subyt(
         template_name=args.name,
         template_folder=args.templates,
@@ -148,6 +334,20 @@ def make_service(args: Namespace) -> Subyt:
         variables=SemaArgsParser.args_to_dict(args.var),
         mode=args.mode,
         unique_pattern=args.output if args.unique == "#" else args.unique,
+        dedupe=args.dedupe,
+        workers=args.workers,
+        incremental=args.incremental,
+        prune=args.prune,
+        writers=args.writers,
+        archive=args.archive,
+        rotate_records=args.rotate_records,
+        rotate_bytes=args.rotate_bytes,
+        batch_size=args.batch,
+        targets=targets,
+        shard=args.shard,
+        shard_key=args.shard_key,
+        checkpoint=args.checkpoint,
+        resume=args.resume,
     )
 
 
@@ -156,16 +356,22 @@ def _main(*args_list) -> bool:
     args = get_arg_parser().parse_args(args_list)
     toreturn = False
     try:
-        subyt = make_service(args)
-        r = subyt.process()
-        log.debug("processing done")
-        toreturn = r.success
+        if args.merge_shards > 0:
+            ShardFileSink.merge(args.output, args.merge_shards, args.force)
+            log.debug("merging done")
+            toreturn = True
+        else:
+            subyt = make_service(args)
+            r = subyt.process()
+            log.debug("processing done")
+            toreturn = r.success
     except Exception as e:
         log.exception("sema.subyt processing failed", exc_info=e)
     finally:
         try:
             if "subyt" in locals() and subyt is not None:
-                subyt._sink.close()
+                for sink in subyt._sinks:
+                    sink.close()
         except Exception as e:
             log.exception("Failed to close subyt", exc_info=e)
     return toreturn
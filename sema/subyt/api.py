@@ -1,20 +1,103 @@
-import itertools
+import hashlib
+import json
 import logging
 from abc import ABC, abstractmethod
+from collections import deque
 from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing.util import Finalize
 from pathlib import Path
 from typing import Callable, Dict
 
+from .checkpoint import Checkpoint
+from .records import FLATTEN_SEPARATOR, RecordTransformer
+from .sets import SPILL_THRESHOLD, MaterializedSet
+
 log = logging.getLogger(__name__)
 
+# number of records handed to a worker process in one go
+PARALLEL_CHUNK_SIZE: int = 256
+
 
 class Sink(ABC):
     """Abstract Interface for sinks"""
 
+    # parts must be added in the order of the source records
+    #   sinks that do not care (e.g. one file per record) can set this False
+    #   allowing parallel rendering to hand over parts as they are ready
+    ordered: bool = True
+    # the sink keeps track of the records its output was produced from
+    #   see is_unchanged()
+    incremental: bool = False
+    # every part must be added with the record it was produced from
+    #   (e.g. one file per record), so records can not be rendered in batch
+    per_record: bool = False
+
     def __init__(self) -> None:
         # lastModifiedTime for each file in the sink, t = 0 by default
         self.mtimes = {".": 0.0}
 
+    def is_unchanged(self, item: dict | None, fingerprint: str) -> bool:
+        """Checks if the sink already holds the output for this item,
+        produced from a record with the same fingerprint.
+        When True, the item is not rendered nor added to the sink.
+        Only called for incremental sinks, the default never skips.
+
+        :param item: the record about to be rendered
+        :type item: dict
+        :param fingerprint: hash of the record, template and variables
+        :type fingerprint: str
+        """
+        return False
+
+    @property
+    def record_fields(self) -> set:
+        """Names of the record fields the sink itself needs
+        (e.g. to build file names), none by default"""
+        return set()
+
+    def set_header(self, header: str) -> None:
+        """Receives the header declared by the template (e.g. prefixes),
+        for sinks that need to repeat it (e.g. at the start of each file).
+        Called before the sink is opened, the default ignores it.
+
+        :param header: the rendered header
+        :type header: str
+        """
+
+    def set_footer(self, footer: str) -> None:
+        """Receives the footer declared by the template (e.g. closing
+        brackets), for sinks that need to recognise it in their output.
+        Called before the sink is opened, the default ignores it.
+
+        :param footer: the rendered footer
+        :type footer: str
+        """
+
+    @property
+    def checkpoint_path(self) -> Path | None:
+        """Where to keep the checkpoints of a job writing to this sink,
+        None (the default) for sinks that can not resume an interrupted job
+        """
+        return None
+
+    def checkpoint(self) -> dict:
+        """Makes sure all parts added so far are written, returning the
+        state to resume from (e.g. the offset in the file).
+        Only called for sinks with a checkpoint_path.
+        """
+        return dict()
+
+    def resume(self, state: dict) -> None:
+        """Prepares to continue the output from the state of a checkpoint,
+        dropping what was added after it. Called before the sink is opened.
+        Only called for sinks with a checkpoint_path.
+
+        :param state: as returned by checkpoint()
+        :type state: dict
+        """
+
     @abstractmethod
     def open(self):
         """Open file handle to Sink"""
@@ -55,6 +138,16 @@ class Source(ABC):
     def __exit__(self, *exc):
         """Source context cleanup"""
 
+    def project(self, fields: set | None) -> None:
+        """Declares the only fields of the records that will be used,
+        so sources that can (e.g. columnar formats) skip reading others.
+        Names are to be matched ignoring case, to support the ignorecase
+        mode. None means all fields could be used. The default ignores this.
+
+        :param fields: names of the fields to provide, None for all
+        :type fields: set | None
+        """
+
     def _init_mtimes(self, file_paths: list[Path]):
         """Initializes the source, sets the mtimes dict for the source_files"""
         if file_paths:
@@ -167,6 +260,9 @@ class GeneratorSettings:
         return f"GeneratorSettings('{self.as_modifier_str()}')"
 
     def __getattr__(self, key: str) -> bool:
+        if "_values" not in self.__dict__:
+            # not initialized (yet) -- e.g. while unpickling
+            raise AttributeError(key)
         return self._values[key]
 
     def __setattr__(self, key: str, val: bool) -> None:
@@ -185,24 +281,20 @@ class ReIterableAccess(dict):
     """Helper class wraps around an existing dict of iterables,
     making it posible to access the members so that they return
     independent object wrappers that insure totally
-    independent iterating loops into them
+    independent iterating loops into them.
+    To that end the iterables are materialized (read once) on first use.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, spill_threshold=SPILL_THRESHOLD, **kwargs):
+        self._spill_threshold = spill_threshold
         self.update(*args, **kwargs)
 
-    def __getitem__(self, key: str) -> Iterable:
-        it = dict.__getitem__(self, key)
-        # itertools.tee, makes retrieved iterators iterable again
-        #   after accessing it from this dict again
-        it, cln = itertools.tee(it, 2)
-        dict.__setitem__(self, key, it)
-        return cln
-
     def __setitem__(self, key: str, val: Iterable):
         assert isinstance(
             val, Iterable
         ), "This dict only accepts Iterable objects as value"
+        if not isinstance(val, MaterializedSet):
+            val = MaterializedSet(val, self._spill_threshold)
         dict.__setitem__(self, key, val)
 
     def __repr__(self):
@@ -213,24 +305,158 @@ class ReIterableAccess(dict):
         for k, v in dict(*args, **kwargs).items():
             self[k] = v
 
+    def stream(self, key: str) -> Iterable:
+        """Takes out the named iterable for a single pass over it,
+        without materializing it"""
+        return dict.pop(self, key).stream()
+
+    def close(self):
+        """Releases all materialized content"""
+        for val in self.values():
+            val.close()
+
 
 class IteratorsFromSources(dict):
     """
     Helper class managing the context entry of the various sources.
+    The records of the sources pass the RecordTransformer for the
+    flatten and ignorecase modes of the generator_settings, if given
+    (except for indexed sets, which are looked up by their records as is).
     """
 
+    def __init__(
+        self,
+        sources: Dict[str, Source],
+        generator_settings: GeneratorSettings | None = None,
+    ):
+        super().__init__(sources)
+        self._generator_settings = generator_settings
+
+    def _transformed(self, it: Iterable) -> Iterable:
+        if self._generator_settings is None:
+            return it
+        if isinstance(it, MaterializedSet):
+            return it
+        transformer = RecordTransformer.from_settings(self._generator_settings)
+        return it if transformer is None else transformer.transform(it)
+
     def __enter__(self):
         iterators = dict()
         for name, source in self.items():
             it = source.__enter__()
-            iterators[name] = it
-        return ReIterableAccess(iterators)
+            iterators[name] = self._transformed(it)
+        self._sets = ReIterableAccess(iterators)
+        return self._sets
 
     def __exit__(self, *exc):
+        self._sets.close()
         for name, source in self.items():
             source.__exit__(*exc)
 
 
+def _hash_json(content: object) -> str:
+    dump = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(dump.encode("utf-8")).hexdigest()
+
+
+def fingerprint_base(template_fingerprint: str, vars_dict: dict | None) -> str:
+    """Combines what determines the output of any record, but the record"""
+    return _hash_json([template_fingerprint, vars_dict or {}])
+
+
+def record_fingerprint(base: str, item: object) -> str:
+    """Hash identifying the output to be produced for the item"""
+    return _hash_json([base, item])
+
+
+def _ctrl_chunks(data: Iterable, chunk_size: int) -> Iterable[list]:
+    """Groups the records in data into chunks of (item, ctrl) tuples
+    where ctrl holds the isFirst, isLast and index as the Processor sets them
+    (this includes rendering once with item None for empty data)
+    """
+    end = object()
+    it = iter(data)
+    queued = next(it, None)  # mimic Processor: empty data renders None once
+    chunk: list = []
+    index = 0
+    while queued is not end:
+        item, queued = queued, next(it, end)
+        ctrl = {
+            "isFirst": index == 0,
+            "isLast": queued is end,
+            "index": index,
+        }
+        chunk.append((item, ctrl))
+        index += 1
+        if len(chunk) >= chunk_size or queued is end:
+            yield chunk
+            chunk = []
+
+
+def record_ctrls(batch: list, ctrl: dict) -> Iterable[tuple]:
+    """Splits a batch into (item, ctrl) tuples where ctrl is the one the
+    Processor sets when rendering the item on its own, derived from the ctrl
+    of the batch (an empty batch yields item None once, like the Processor)
+    """
+    if not batch:
+        yield None, ctrl
+        return
+    last = len(batch) - 1
+    for i, item in enumerate(batch):
+        yield item, {
+            "isFirst": ctrl["isFirst"] and i == 0,
+            "isLast": ctrl["isLast"] and i == last,
+            "index": ctrl["index"] + i,
+            "settings": ctrl["settings"],
+        }
+
+
+# state of the render worker processes, set once per process
+_worker: dict = dict()
+
+
+def _init_render_worker(
+    generator: "Generator",
+    template_name: str,
+    extra_inputs: Dict[str, Source],
+    generator_settings: GeneratorSettings,
+    vars_dict: dict | None,
+) -> None:
+    """Initializes a worker process: loads the template once
+    and opens the extra sources made available as sets"""
+    _worker["render"] = generator.make_render_fn(template_name)
+    # these stay open for the lifetime of the worker process
+    sources = IteratorsFromSources(extra_inputs, generator_settings)
+    _worker["sets"] = sources.__enter__()
+    # exited (releasing sets spilled to disk) when the worker process ends
+    Finalize(None, sources.__exit__, args=(None, None, None), exitpriority=0)
+    _worker["settings"] = generator_settings
+    _worker["variables"] = vars_dict if vars_dict is not None else {}
+
+
+def _render_chunk(chunk: list) -> list:
+    """Renders a chunk of (item, ctrl) tuples in a worker process
+    returns the list of rendered parts (None for failed records)"""
+    render = _worker["render"]
+    settings = _worker["settings"]
+    parts = []
+    for item, ctrl in chunk:
+        part = None
+        try:
+            part = render(
+                _=item,
+                sets=_worker["sets"],
+                ctrl=dict(ctrl, settings=settings),
+                **_worker["variables"],
+            )
+        except Exception:
+            log.exception(f"error while processing {item=}")
+            if settings.break_on_error:
+                raise
+        parts.append(part)
+    return parts
+
+
 class Generator(ABC):
     """Abstract Base Class for the actual generation Service"""
 
@@ -239,6 +465,55 @@ class Generator(ABC):
         """Produces the actual render strategy tied to a specific
         templating implementation"""
 
+    def make_batch_render_fn(self, template_name: str) -> Callable:
+        """Produces the render strategy for a chunk of records, passed as
+        ``_batch`` with a ``ctrl`` describing the chunk as a whole.
+        The default renders the records one by one with make_render_fn."""
+        render = self.make_render_fn(template_name)
+
+        def render_batch(_batch: list, ctrl: dict, **variables) -> str:
+            return "".join(
+                render(_=item, ctrl=item_ctrl, **variables)
+                for item, item_ctrl in record_ctrls(_batch, ctrl)
+            )
+
+        return render_batch
+
+    def template_fingerprint(self, template_name: str) -> str:
+        """Identifies the content of the template, so incremental sinks can
+        detect changes to it. Defaults to just the name."""
+        return template_name
+
+    def render_header(
+        self, template_name: str, vars_dict: dict | None = None
+    ) -> str | None:
+        """Renders the header declared by the template,
+        None if the template does not declare one (the default)."""
+        return None
+
+    def render_footer(
+        self, template_name: str, vars_dict: dict | None = None
+    ) -> str | None:
+        """Renders the footer declared by the template,
+        None if the template does not declare one (the default)."""
+        return None
+
+    def record_fields(self, template_name: str) -> set | None:
+        """Names of the fields of the (iterated) records used by the template,
+        None (the default) if that can not be determined."""
+        return None
+
+    def sets_used(self, template_name: str) -> set | None:
+        """Names of the sets read by the template (through ``sets``),
+        None (the default) if that can not be determined."""
+        return None
+
+    def _streams_base(self, template_name: str) -> bool:
+        """True if the template surely does not read the base set "_"
+        through ``sets``, so it can be streamed rather than materialized"""
+        used = self.sets_used(template_name)
+        return used is not None and "_" not in used
+
     def make_processor(
         self,
         template_name: str,
@@ -247,7 +522,18 @@ class Generator(ABC):
         sink: Sink,
         source_mtime: float | None = None,
         vars_dict: dict | None = None,
+        batch_size: int = 0,
     ):
+        if batch_size > 0:
+            return Generator.BatchProcessor(
+                self.make_batch_render_fn(template_name),
+                sets,
+                generator_settings,
+                sink,
+                batch_size,
+                source_mtime,
+                vars_dict,
+            )
         return Generator.Processor(
             self.make_render_fn(template_name),
             sets,
@@ -255,6 +541,16 @@ class Generator(ABC):
             sink,
             source_mtime,
             vars_dict,
+            self._fingerprint_base(template_name, sink, vars_dict),
+        )
+
+    def _fingerprint_base(
+        self, template_name: str, sink: Sink, vars_dict: dict | None
+    ) -> str | None:
+        if not sink.incremental:
+            return None
+        return fingerprint_base(
+            self.template_fingerprint(template_name), vars_dict
         )
 
     class Processor:
@@ -275,6 +571,7 @@ class Generator(ABC):
             sink: Sink,
             source_mtime: float | None = None,
             vars_dict: dict | None = None,
+            fingerprint_base: str | None = None,
         ):
             self.render = render_fn
             self.sets = sets
@@ -282,6 +579,7 @@ class Generator(ABC):
             self.sink = sink
             self.source_mtime = source_mtime
             self.variables = vars_dict if vars_dict is not None else {}
+            self.fingerprint_base = fingerprint_base
             self.queued_item = None
             self.isFirst = True
             self.isLast = False
@@ -297,12 +595,19 @@ class Generator(ABC):
             assert (
                 next_item is not None
             ), "no item to take - use all_taken() for finalization in stead"
-            if not self.isFirst or (
-                self.isFirst and self.queued_item is not None
-            ):  # on first call only queue
+            if self.queued_item is not None:  # on first call only queue
                 self.push()
             self.queued_item = next_item
 
+        def resume_at(self, index: int):
+            """Continues the output of a previous run that processed the
+            first index records, the (resumed) sink is opened as if those
+            were just pushed
+            """
+            self.sink.open()
+            self.isFirst = False
+            self.index = index
+
         def all_taken(self):
             """Indicates all items have been taken -- finalization
 
@@ -319,6 +624,9 @@ class Generator(ABC):
                 self.sink.open()
             log.debug(f"processing item _ = {item}")
             try:
+                if self._is_unchanged(item):
+                    log.debug("skipping item, its output is unchanged")
+                    return
                 part = self.render(
                     _=item,
                     sets=self.sets,
@@ -335,10 +643,91 @@ class Generator(ABC):
                 log.exception(f"error while processing {item=}")
                 if self.generator_settings.break_on_error:
                     raise
+            finally:
+                self.queued_item = None
+                self.isFirst = False
+                self.index += 1
 
-            self.queued_item = None
-            self.isFirst = False
-            self.index += 1
+        def _is_unchanged(self, item) -> bool:
+            if self.fingerprint_base is None or item is None:
+                return False
+            fingerprint = record_fingerprint(self.fingerprint_base, item)
+            return self.sink.is_unchanged(item, fingerprint)
+
+    class BatchProcessor(Processor):
+        """Rendition process Manager rendering chunks of records at once
+
+        The records are queued up to batch_size, and rendered in one call
+          with the list of them as ``_batch``, and a ``ctrl`` describing
+          the chunk (isFirst and isLast for the first and last chunk, and
+          the index of its first record).
+        Each chunk is added to the sink as one part, so an error in one
+          record drops the part of the whole chunk.
+        """
+
+        def __init__(
+            self,
+            render_fn: Callable,
+            sets: Dict[str, Iterable],
+            generator_settings: GeneratorSettings,
+            sink: Sink,
+            batch_size: int,
+            source_mtime: float | None = None,
+            vars_dict: dict | None = None,
+        ):
+            super().__init__(
+                render_fn,
+                sets,
+                generator_settings,
+                sink,
+                source_mtime,
+                vars_dict,
+            )
+            assert batch_size > 0, "batch_size should be positive"
+            self.batch_size = batch_size
+            self.batch: list = []
+
+        def take(self, next_item):
+            """Takes next item to be rendered and synced
+            (queued until the next take after the batch is full)
+            """
+            assert (
+                next_item is not None
+            ), "no item to take - use all_taken() for finalization in stead"
+            if len(self.batch) >= self.batch_size:
+                self.push()
+            self.batch.append(next_item)
+
+        def push(self):
+            """Actually pushes the batch queued"""
+            batch = self.batch
+            if self.isFirst:
+                self.sink.open()
+            log.debug(f"processing batch of {len(batch)} at {self.index}")
+            try:
+                part = self.render(
+                    _batch=batch,
+                    sets=self.sets,
+                    ctrl={
+                        "isFirst": self.isFirst,
+                        "isLast": self.isLast,
+                        "index": self.index,
+                        "settings": self.generator_settings,
+                    },
+                    **self.variables,
+                )
+                self.sink.add(part, None, self.source_mtime)
+            except Exception:
+                log.exception(
+                    f"error while processing batch of {len(batch)} records "
+                    f"starting at index {self.index}"
+                )
+                if self.generator_settings.break_on_error:
+                    raise
+            finally:
+                self.batch = []
+                self.isFirst = False
+                self.index += len(batch)
 
     def process(
         self,
@@ -348,6 +737,11 @@ class Generator(ABC):
         sink: Sink,
         vars_dict: dict | None = None,
         conditional: bool = False,
+        workers: int = 1,
+        chunk_size: int = PARALLEL_CHUNK_SIZE,
+        batch_size: int = 0,
+        checkpoint_interval: int = 0,
+        resume: bool = False,
     ) -> None:
         """Process the records found in the base input and
             write them to the sink.
@@ -361,41 +755,382 @@ class Generator(ABC):
         :type generator_settings: GeneratorSettings
         :param sink: the sink to write result to
         :type sink: Sink
+        :param workers: number of worker processes rendering records
+            in parallel, only applies in iteration mode (default 1 = serial)
+        :type workers: int
+        :param chunk_size: number of records handed to a worker at once
+        :type chunk_size: int
+        :param batch_size: number of records to render in one call of the
+            template, in iteration mode, see BatchProcessor
+            (default 0 = one call per record)
+        :type batch_size: int
+        :param checkpoint_interval: number of records between checkpoints
+            of the progress, in iteration mode and for sinks supporting it
+            (default 0 = no checkpoints)
+        :type checkpoint_interval: int
+        :param resume: continue from the last checkpoint (if any) of an
+            interrupted run of the same job, rather than starting over
+        :type resume: bool
         """
-        source_mtimes = [v.mtimes for v in inputs.values()]
         source_mtime = (
             None  # default source_mtime for non-conditional processing
         )
         if conditional:
-            source_mtime = max([v for d in source_mtimes for v in d.values()])
-            # sink.mtimes is None for a PatternedFileSink,
-            # but other Sinks can already be handled here
-            if sink.mtimes and (
-                source_mtime < min([v for v in sink.mtimes.values()])
-            ):
-                logging.info(
-                    f"Aborting process (source_mtimes = {source_mtimes}; "
-                    f"sink_mtimes = {sink.mtimes})"
-                )
+            source_mtime = self._source_mtime(inputs)
+            if self._sink_up_to_date(sink, source_mtime, inputs):
                 return
-        # convert inputs into sets
-        with IteratorsFromSources(inputs) as sets:
-            proc = self.make_processor(
+        if "_" in inputs and generator_settings.iteration:
+            inputs["_"].project(
+                self._fields_used(template_name, sink, generator_settings)
+            )
+        self._set_header_footer(template_name, sink, vars_dict)
+        batch_size = self._batch_size_for(sink, batch_size)
+        parallel = workers > 1 and generator_settings.iteration
+        parallel = parallel and "_" in inputs
+        if parallel and not self._streams_base(template_name):
+            log.warning(
+                "Parallel workers can not read the base set as a whole. "
+                "Rendering sequentially."
+            )
+            parallel = False
+        if parallel:
+            if batch_size > 0:
+                log.warning(
+                    "Batch rendering not supported with parallel workers. "
+                    "Rendering per record."
+                )
+            if checkpoint_interval > 0:
+                log.warning(
+                    "Checkpoints not supported with parallel workers. "
+                    "Processing without them."
+                )
+            self._process_parallel(
                 template_name,
-                sets,
+                inputs,
                 generator_settings,
                 sink,
                 source_mtime,
                 vars_dict,
+                workers,
+                chunk_size,
             )
-
+            return
+        # else convert inputs into sets
+        with IteratorsFromSources(inputs, generator_settings) as sets:
             if (
                 not generator_settings.iteration or "_" not in sets
             ):  # conditions for collection modus
                 generator_settings.iteration = False
+                batch_size = 0
+            proc = self.make_processor(
+                template_name,
+                sets,
+                generator_settings,
+                sink,
+                source_mtime,
+                vars_dict,
+                batch_size=batch_size,
+            )
+
+            if not generator_settings.iteration:  # collection modus
                 proc.all_taken()
             else:  # default modus
-                data = sets["_"]
+                # the base set is iterated once, no need to materialize it
+                #   unless the template reads it as a whole too
+                if self._streams_base(template_name):
+                    data = sets.stream("_")
+                else:
+                    data = sets["_"]
+                checkpoint = None
+                if checkpoint_interval > 0:
+                    checkpoint = self._make_checkpoint(
+                        template_name,
+                        inputs,
+                        generator_settings,
+                        sink,
+                        vars_dict,
+                        checkpoint_interval,
+                    )
+                if checkpoint is None:
+                    for item in data:
+                        proc.take(item)
+                    proc.all_taken()
+                else:
+                    self._take_checkpointed(proc, data, checkpoint, resume)
+
+    def _make_checkpoint(
+        self,
+        template_name: str,
+        inputs: Dict[str, Source],
+        generator_settings: GeneratorSettings,
+        sink: Sink,
+        vars_dict: dict | None,
+        interval: int,
+    ) -> Checkpoint | None:
+        if sink.checkpoint_path is None:
+            log.warning(f"Checkpoints not supported by {sink}, ignoring...")
+            return None
+        job = _hash_json(
+            [
+                template_name,
+                fingerprint_base(
+                    self.template_fingerprint(template_name), vars_dict
+                ),
+                generator_settings.as_modifier_str(),
+                {name: source.mtimes for name, source in inputs.items()},
+            ]
+        )
+        return Checkpoint(sink.checkpoint_path, job, interval)
+
+    @staticmethod
+    def _take_checkpointed(
+        proc: "Generator.Processor",
+        data: Iterable,
+        checkpoint: Checkpoint,
+        resume: bool,
+    ) -> None:
+        """Hands the records to the processor, saving a checkpoint of the
+        progress every so many records (as far as pushed to the sink)"""
+        start = 0
+        state = checkpoint.load() if resume else None
+        if state is not None:
+            start = state["index"]
+            log.info(f"Resuming from {checkpoint} at record {start}")
+            proc.sink.resume(state["sink"])
+            proc.resume_at(start)
+            data = islice(data, start, None)
+        next_at = start + checkpoint.interval
+        for item in data:
+            proc.take(item)
+            if proc.index >= next_at:
+                checkpoint.save(proc.index, proc.sink.checkpoint())
+                next_at = proc.index + checkpoint.interval
+        proc.all_taken()
+        checkpoint.remove()
+
+    def process_targets(
+        self,
+        targets: list,
+        inputs: Dict[str, Source],
+        vars_dict: dict | None = None,
+        conditional: bool = False,
+        batch_size: int = 0,
+    ) -> None:
+        """Process the records found in the base input for a number of
+            targets at once, each rendering its template into its sink.
+        The base input is read once: every record is handed to the
+        processors of all targets in iteration mode, each keeping its own
+        ctrl (isFirst, isLast, index). Targets in collection mode get the
+        base input (then materialized) as a whole.
+        The flatten and ignorecase modes apply to the records if any of the
+        targets asks for them.
+
+        :param targets: list of (template_name, sink, generator_settings)
+        :type targets: list
+        :param input: dict of named Source objects providing content
+        :type inputs: Dict[str, Source]
+        :param conditional: skip the targets with sinks newer than the inputs
+        :type conditional: bool
+        :param batch_size: number of records to render in one call of the
+            templates, see process()
+        :type batch_size: int
+        """
+        if conditional:
+            source_mtime = self._source_mtime(inputs)
+            targets = [
+                (template_name, sink, settings)
+                for template_name, sink, settings in targets
+                if not self._sink_up_to_date(sink, source_mtime, inputs)
+            ]
+        else:
+            source_mtime = None
+        if not targets:
+            return
+        for template_name, sink, settings in targets:
+            if "_" not in inputs:  # conditions for collection modus
+                settings.iteration = False
+            self._set_header_footer(template_name, sink, vars_dict)
+        iterating = [settings.iteration for _, _, settings in targets]
+        if "_" in inputs:
+            # project on the fields used by all, or none if any uses all
+            fields: set | None = set()
+            for template_name, sink, settings in targets:
+                used = None
+                if settings.iteration:
+                    used = self._fields_used(template_name, sink, settings)
+                if fields is None or used is None:
+                    fields = None
+                else:
+                    fields |= used
+            inputs["_"].project(fields)
+        record_settings = GeneratorSettings()
+        record_settings.flatten = any(s.flatten for _, _, s in targets)
+        record_settings.ignorecase = any(s.ignorecase for _, _, s in targets)
+
+        with IteratorsFromSources(inputs, record_settings) as sets:
+            procs = [
+                self.make_processor(
+                    template_name,
+                    sets,
+                    settings,
+                    sink,
+                    source_mtime,
+                    vars_dict,
+                    batch_size=(
+                        self._batch_size_for(sink, batch_size)
+                        if settings.iteration
+                        else 0
+                    ),
+                )
+                for template_name, sink, settings in targets
+            ]
+            takers = [proc for proc, it in zip(procs, iterating) if it]
+            if takers:
+                # materialize the base set only if needed as a whole too
+                streams = all(iterating) and all(
+                    self._streams_base(template_name)
+                    for template_name, _, _ in targets
+                )
+                data = sets.stream("_") if streams else sets["_"]
                 for item in data:
-                    proc.take(item)
+                    for proc in takers:
+                        proc.take(item)
+            for proc in procs:
                 proc.all_taken()
+
+    @staticmethod
+    def _source_mtime(inputs: Dict[str, Source]) -> float:
+        return max([v for s in inputs.values() for v in s.mtimes.values()])
+
+    @staticmethod
+    def _sink_up_to_date(
+        sink: Sink, source_mtime: float, inputs: Dict[str, Source]
+    ) -> bool:
+        # sink.mtimes is None for a PatternedFileSink,
+        # but other Sinks can already be handled here
+        if sink.mtimes and (
+            source_mtime < min([v for v in sink.mtimes.values()])
+        ):
+            source_mtimes = [v.mtimes for v in inputs.values()]
+            logging.info(
+                f"Aborting process (source_mtimes = {source_mtimes}; "
+                f"sink_mtimes = {sink.mtimes})"
+            )
+            return True
+        return False
+
+    def _fields_used(
+        self,
+        template_name: str,
+        sink: Sink,
+        generator_settings: GeneratorSettings,
+    ) -> set | None:
+        """The fields of the records needed by the template and the sink"""
+        fields = self.record_fields(template_name)
+        if fields is None:
+            return None
+        fields = fields | sink.record_fields
+        if generator_settings.flatten:
+            # flattened fields are read from the nested record on top
+            fields |= {f.split(FLATTEN_SEPARATOR, 1)[0] for f in fields}
+        return fields
+
+    def _set_header_footer(
+        self, template_name: str, sink: Sink, vars_dict: dict | None
+    ) -> None:
+        header = self.render_header(template_name, vars_dict)
+        if header is not None:
+            sink.set_header(header)
+        footer = self.render_footer(template_name, vars_dict)
+        if footer is not None:
+            sink.set_footer(footer)
+
+    @staticmethod
+    def _batch_size_for(sink: Sink, batch_size: int) -> int:
+        if batch_size > 0 and sink.per_record:
+            log.warning(
+                "Batch rendering not supported by this sink, "
+                "which needs a part per record. Rendering per record."
+            )
+            return 0
+        return batch_size
+
+    def _process_parallel(
+        self,
+        template_name: str,
+        inputs: Dict[str, Source],
+        generator_settings: GeneratorSettings,
+        sink: Sink,
+        source_mtime: float | None,
+        vars_dict: dict | None,
+        workers: int,
+        chunk_size: int,
+    ) -> None:
+        """Renders the records of the base input in chunks by a pool of
+        worker processes, each loading the template once.
+        Parts are added to the sink in source order,
+        unless the sink declares not to need that.
+        """
+        extra_inputs = {k: v for k, v in inputs.items() if k != "_"}
+        fp_base = self._fingerprint_base(template_name, sink, vars_dict)
+        transformer = RecordTransformer.from_settings(generator_settings)
+        pending: deque = deque()
+        max_pending = 2 * workers
+
+        def sink_parts(chunk: list, parts: list) -> None:
+            for (item, ctrl), part in zip(chunk, parts):
+                if part is None:
+                    continue
+                try:
+                    sink.add(part, item, source_mtime)
+                except Exception:
+                    log.exception(f"error while processing {item=}")
+                    if generator_settings.break_on_error:
+                        raise
+
+        def sink_ready(block_all: bool) -> None:
+            while pending and (block_all or len(pending) >= max_pending):
+                if sink.ordered:
+                    chunk, future = pending.popleft()
+                    sink_parts(chunk, future.result())
+                    continue
+                # else hand over whatever is done first
+                wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+                for entry in [e for e in pending if e[1].done()]:
+                    pending.remove(entry)
+                    sink_parts(entry[0], entry[1].result())
+
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_render_worker,
+            initargs=(
+                self,
+                template_name,
+                extra_inputs,
+                generator_settings,
+                vars_dict,
+            ),
+        )
+        try:
+            with inputs["_"] as data:
+                if transformer is not None:
+                    data = transformer.transform(data)
+                sink.open()
+                for chunk in _ctrl_chunks(data, chunk_size):
+                    if fp_base is not None:
+                        chunk = [
+                            (item, ctrl)
+                            for item, ctrl in chunk
+                            if item is None
+                            or not sink.is_unchanged(
+                                item, record_fingerprint(fp_base, item)
+                            )
+                        ]
+                    if not chunk:
+                        continue
+                    pending.append((chunk, pool.submit(_render_chunk, chunk)))
+                    sink_ready(block_all=False)
+                sink_ready(block_all=True)
+            sink.close()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
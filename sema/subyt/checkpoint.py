@@ -0,0 +1,61 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# default number of records processed between checkpoints
+CHECKPOINT_INTERVAL: int = 10_000
+# suffix of the checkpoint file kept next to a single output file
+CHECKPOINT_SUFFIX: str = ".checkpoint.json"
+
+
+class Checkpoint:
+    """Progress of a job, saved to a json file every interval records, so an
+    interrupted job can resume from there rather than start over.
+    It holds the number of records of the base input processed, and the
+    state of the sink at that point (e.g. the offset in the output file).
+    The file is removed once the job completes.
+
+    :param path: the file to save the checkpoint to
+    :param job: identifies the job (template, variables, inputs...)
+        a checkpoint saved for another job is not resumed from
+    :param interval: number of records between checkpoints
+    """
+
+    def __init__(
+        self, path: str | Path, job: str, interval: int = CHECKPOINT_INTERVAL
+    ) -> None:
+        assert interval > 0, "checkpoint interval should be positive"
+        self._path = Path(path)
+        self._job = job
+        self.interval = interval
+
+    def __repr__(self) -> str:
+        return f"Checkpoint('{self._path}', {self.interval})"
+
+    def load(self) -> dict | None:
+        """The state saved for this job, None if there is none"""
+        if not self._path.is_file():
+            log.info(f"No {self} to resume from, starting over")
+            return None
+        state = json.loads(self._path.read_text())
+        if state.get("job") != self._job:
+            log.warning(f"{self} was saved for another job, starting over")
+            return None
+        return state
+
+    def save(self, index: int, sink_state: dict) -> None:
+        """Saves the progress: index records processed, and the sink state
+        (replacing the previous checkpoint at once, never leaving half)"""
+        state = dict(job=self._job, index=index, sink=sink_state)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._path.with_name(f"{self._path.name}.tmp")
+        temp_path.write_text(json.dumps(state))
+        os.replace(temp_path, self._path)
+        log.debug(f"{self} saved at {index=}")
+
+    def remove(self) -> None:
+        """Removes the checkpoint, as the job completed"""
+        self._path.unlink(missing_ok=True)
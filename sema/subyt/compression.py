@@ -0,0 +1,108 @@
+import bz2
+import gzip
+import io
+import logging
+import lzma
+from pathlib import Path
+from typing import BinaryIO
+
+log = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# size of the buffers used to batch writes to (compressed) output files
+WRITE_BUFFER_SIZE: int = 1 << 20
+# file suffixes recognised as compressed content
+COMPRESSION_SUFFIXES: tuple = (".gz", ".bz2", ".xz", ".zst")
+
+
+def compression_of(path: str | Path) -> str | None:
+    """The compression suffix of the path, None if not compressed"""
+    suffix = Path(path).suffix.lower()
+    return suffix if suffix in COMPRESSION_SUFFIXES else None
+
+
+def _select(path: str | Path, compression: str | None) -> str | None:
+    """The compression to use: the explicit one (e.g. 'gz' or '.gz'),
+    else the one derived from the path suffix"""
+    if not compression:
+        return compression_of(path)
+    suffix = "." + compression.lower().lstrip(".")
+    if suffix not in COMPRESSION_SUFFIXES:
+        raise ValueError(
+            f"Unsupported compression '{compression}', "
+            f"use one of {COMPRESSION_SUFFIXES}"
+        )
+    return suffix
+
+
+def inner_name(path: str | Path) -> str:
+    """The name of the path without its compression suffix
+    (e.g. 'data.csv' for 'data.csv.gz')"""
+    name = Path(path).name
+    if compression_of(name) is None:
+        return name
+    return name[: -len(Path(name).suffix)]
+
+
+def _assert_zstandard():
+    assert (
+        zstandard is not None
+    ), "zstd compression requires the 'zstandard' package to be installed"
+
+
+def open_reader(path: str | Path, compression: str | None = None) -> BinaryIO:
+    """Opens the file for binary reading, transparently decompressing
+    according to its suffix (or the explicitly passed compression)"""
+    compression = _select(path, compression)
+    if compression == ".gz":
+        return gzip.open(path, "rb")
+    if compression == ".bz2":
+        return bz2.open(path, "rb")
+    if compression == ".xz":
+        return lzma.open(path, "rb")
+    if compression == ".zst":
+        _assert_zstandard()
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.BufferedReader(reader)
+    return open(path, "rb")
+
+
+def open_text_reader(
+    path: str | Path,
+    encoding: str = "utf-8",
+    newline: str | None = None,
+    compression: str | None = None,
+) -> io.TextIOBase:
+    """Opens the file for text reading, transparently decompressing
+    according to its suffix (or the explicitly passed compression)"""
+    compression = _select(path, compression)
+    if compression is None:
+        return open(path, "r", encoding=encoding, newline=newline)
+    return io.TextIOWrapper(
+        open_reader(path, compression), encoding=encoding, newline=newline
+    )
+
+
+def open_writer(path: str | Path) -> BinaryIO:
+    """Opens the file for binary writing through a large buffer,
+    compressing according to its suffix"""
+    compression = compression_of(path)
+    if compression is None:
+        return open(path, "wb", buffering=WRITE_BUFFER_SIZE)
+    if compression == ".gz":
+        stream = gzip.open(path, "wb")
+    elif compression == ".bz2":
+        stream = bz2.open(path, "wb")
+    elif compression == ".xz":
+        stream = lzma.open(path, "wb")
+    else:  # compression == ".zst"
+        _assert_zstandard()
+        stream = zstandard.ZstdCompressor().stream_writer(
+            open(path, "wb"), closefd=True
+        )
+    return io.BufferedWriter(stream, buffer_size=WRITE_BUFFER_SIZE)
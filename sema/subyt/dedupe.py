@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+
+log = logging.getLogger(__name__)
+
+# default kind of store keeping the keys seen while filtering unique records
+DEFAULT_DEDUPE: str = "memory"
+# number of keys a bloom filter is sized for, unless specified
+BLOOM_CAPACITY: int = 10_000_000
+# rate of false positives (unique keys taken as seen) at that capacity
+BLOOM_ERROR_RATE: float = 0.001
+
+
+class SeenKeys(ABC):
+    """Store remembering the keys seen, to filter out repeated ones"""
+
+    @abstractmethod
+    def add(self, key: str) -> bool:
+        """Adds the key to the store
+
+        :param key: the key to add
+        :returns: True if the key was not seen before
+        """
+
+    def close(self) -> None:
+        """Releases the resources held by the store"""
+
+    @staticmethod
+    def make(dedupe: str | None = None) -> "SeenKeys":
+        """Builds the store of the specified kind:
+        - 'memory' (default) exact, keeping all keys in a set
+        - 'disk' exact, keeping the keys in a temporary sqlite database
+        - 'bloom' or 'bloom:<capacity>' approximate, in fixed memory,
+          taking a few unique keys as seen (see BLOOM_ERROR_RATE)
+        """
+        kind, capacity = SeenKeys.parse(dedupe)
+        if kind == "memory":
+            return MemorySeenKeys()
+        if kind == "disk":
+            return DiskSeenKeys()
+        return BloomSeenKeys(capacity)
+
+    @staticmethod
+    def parse(dedupe: str | None = None) -> tuple:
+        """Checks the kind of store (see make()) without building it
+
+        :returns: (kind, capacity) with the capacity only set for bloom
+        """
+        kind, _, arg = (dedupe or DEFAULT_DEDUPE).partition(":")
+        if kind in ("memory", "disk") and not arg:
+            return kind, None
+        if kind == "bloom" and (not arg or arg.isdigit()):
+            capacity = int(arg) if arg else BLOOM_CAPACITY
+            if capacity > 0:
+                return kind, capacity
+        raise ValueError(
+            f"unknown dedupe '{dedupe}', use memory, disk or bloom[:capacity]"
+        )
+
+
+class MemorySeenKeys(SeenKeys):
+    def __init__(self) -> None:
+        self._seen: set = set()
+
+    def __repr__(self) -> str:
+        return f"MemorySeenKeys({len(self._seen)})"
+
+    def add(self, key: str) -> bool:
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def close(self) -> None:
+        self._seen.clear()
+
+
+class DiskSeenKeys(SeenKeys):
+    """Keeps the keys in a temporary sqlite database, removed on close"""
+
+    def __init__(self) -> None:
+        fd, self._path = tempfile.mkstemp(prefix="subyt-seen-", suffix=".db")
+        os.close(fd)
+        self._db = sqlite3.connect(self._path)
+        # a throw-away database: no need for durability
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute("CREATE TABLE seen (key TEXT PRIMARY KEY)")
+
+    def __repr__(self) -> str:
+        return f"DiskSeenKeys('{self._path}')"
+
+    def add(self, key: str) -> bool:
+        cursor = self._db.execute(
+            "INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,)
+        )
+        return cursor.rowcount == 1
+
+    def close(self) -> None:
+        if self._db is None:
+            return
+        self._db.close()
+        self._db = None
+        os.remove(self._path)
+
+
+class BloomSeenKeys(SeenKeys):
+    """Bloom filter of the keys seen, sized for the capacity and error_rate.
+    Never misses a repeated key, but takes a small fraction of the unique
+    ones as seen (growing beyond the error_rate past the capacity).
+    """
+
+    def __init__(
+        self, capacity: int, error_rate: float = BLOOM_ERROR_RATE
+    ) -> None:
+        assert capacity > 0, "bloom filter capacity should be positive"
+        assert 0 < error_rate < 1, "bloom filter error_rate should be in ]0,1["
+        self._size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        log.debug(f"{self} for {capacity=} and {error_rate=}")
+
+    def __repr__(self) -> str:
+        return f"BloomSeenKeys(bits={self._size}, hashes={self._hashes})"
+
+    def _positions(self, key: str) -> list:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self._size for i in range(self._hashes)]
+
+    def add(self, key: str) -> bool:
+        bits = self._bits
+        new = False
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        return new
+
+    def close(self) -> None:
+        self._bits = bytearray()
@@ -1,10 +1,25 @@
+import hashlib
 import os
+import re
 from typing import Callable
 
-from jinja2 import select_autoescape
+from jinja2 import nodes, select_autoescape
 
 from sema.commons.j2 import J2RDFSyntaxBuilder
-from sema.subyt.api import Generator
+from sema.subyt.api import Generator, record_ctrls
+
+# name of the template block declaring the header (e.g. prefixes)
+HEADER_BLOCK: str = "header"
+# name of the template block declaring the footer (e.g. closing brackets)
+FOOTER_BLOCK: str = "footer"
+# name of the variable holding the records in batch rendering
+BATCH_VARIABLE: str = "_batch"
+# wrapper looping a per-record template source over the records of a batch
+BATCH_ADAPTER: str = (
+    "{{% autoescape {autoescape} %}}"
+    "{{% for _, ctrl in _batch_records %}}{source}{{% endfor %}}"
+    "{{% endautoescape %}}"
+)
 
 
 class JinjaBasedGenerator(Generator):
@@ -12,16 +27,24 @@ class JinjaBasedGenerator(Generator):
     Core class for the jinja based LD Templating service.
     """
 
-    def __init__(self, templates_folder: str = "."):
+    def __init__(
+        self,
+        templates_folder: str = ".",
+        bytecode_cache_dir: str | None = None,
+    ):
         """
         Builds the generator that produces LD output from datasources
 
         :param templates_folder: Location of the templates defaults to "."
+        :param bytecode_cache_dir: Location to persist compiled templates
+            defaults to the SEMA_J2_BYTECODE_CACHE env variable
         """
         self._templates_folder = templates_folder
+        self._bytecode_cache_dir = bytecode_cache_dir
 
         self.syntax_builder = J2RDFSyntaxBuilder(
             templates_folder,
+            bytecode_cache_dir=bytecode_cache_dir,
             extra_filters=None,
             jinja_env_variables={
                 "autoescape": select_autoescape(
@@ -38,11 +61,91 @@ class JinjaBasedGenerator(Generator):
             },
         )
 
+    def __getstate__(self):
+        # the jinja environment is not picklable, rather rebuild it
+        #   e.g. in the worker processes used for parallel rendering
+        return {
+            "templates_folder": self._templates_folder,
+            "bytecode_cache_dir": self._bytecode_cache_dir,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
     def __repr__(self):
         abs_folder = os.path.abspath(self._templates_folder)
         return f"JinjaBasedGenerator('{abs_folder}')"
 
     def make_render_fn(self, template_name: str) -> Callable:
+        # every run starts without maps cached by previous runs
+        self.syntax_builder.reset_cache()
         return self.syntax_builder._get_rdfsyntax_template(
             template_name
         ).render
+
+    def make_batch_render_fn(self, template_name: str) -> Callable:
+        # templates using _batch handle the records themselves
+        builder = self.syntax_builder
+        if BATCH_VARIABLE in builder.variables_in_template(template_name):
+            return self.make_render_fn(template_name)
+        # else compile the template source into a loop over the records,
+        #   avoiding the overhead of a render call per record
+        env = builder._templates_env
+        source, *_ = env.loader.get_source(env, template_name)
+        ast = env.parse(source)
+        if any(ast.find_all((nodes.Extends, nodes.Block))):
+            # blocks can not be wrapped, fall back to rendering per record
+            return super().make_batch_render_fn(template_name)
+        builder.reset_cache()
+        autoescape = env.autoescape
+        if callable(autoescape):
+            autoescape = autoescape(template_name)
+        if not env.keep_trailing_newline:
+            # the newline jinja drops at the end of the template
+            source = re.sub(r"(\r\n|\r|\n)\Z", "", source)
+        wrapper = env.from_string(
+            BATCH_ADAPTER.format(
+                autoescape=str(bool(autoescape)).lower(), source=source
+            )
+        )
+
+        def render_batch(_batch: list, ctrl: dict, **variables) -> str:
+            return wrapper.render(
+                _batch_records=record_ctrls(_batch, ctrl), **variables
+            )
+
+        return render_batch
+
+    def template_fingerprint(self, template_name: str) -> str:
+        # hash of the template source
+        #   (note: changes in included or imported templates are not covered)
+        env = self.syntax_builder._templates_env
+        source, *_ = env.loader.get_source(env, template_name)
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def render_header(
+        self, template_name: str, vars_dict: dict | None = None
+    ) -> str | None:
+        # the {% block header %} of the template, rendered on its own
+        return self._render_block(template_name, HEADER_BLOCK, vars_dict)
+
+    def render_footer(
+        self, template_name: str, vars_dict: dict | None = None
+    ) -> str | None:
+        # the {% block footer %} of the template, rendered on its own
+        return self._render_block(template_name, FOOTER_BLOCK, vars_dict)
+
+    def _render_block(
+        self, template_name: str, block_name: str, vars_dict: dict | None
+    ) -> str | None:
+        template = self.syntax_builder._get_rdfsyntax_template(template_name)
+        block = template.blocks.get(block_name)
+        if block is None:
+            return None
+        return "".join(block(template.new_context(dict(vars_dict or {}))))
+
+    def record_fields(self, template_name: str) -> set | None:
+        return self.syntax_builder.fields_in_template(template_name, "_")
+
+    def sets_used(self, template_name: str) -> set | None:
+        return self.syntax_builder.fields_in_template(template_name, "sets")
@@ -0,0 +1,262 @@
+import json
+import logging
+import re
+from typing import BinaryIO, Callable, Iterator
+
+log = logging.getLogger(__name__)
+
+BOM = b"\xef\xbb\xbf"
+WHITESPACE = b" \t\r\n"
+READ_SIZE = 1 << 16
+
+# structural characters to look for when skipping over containers
+_STRUCTURE = re.compile(rb'["\[\]{}]')
+# a complete json string, escapes included
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+# anything up to the next delimiter: numbers, true, false, null
+_SCALAR = re.compile(rb"[^,:\]}\s]*")
+
+
+class JsonScanner:
+    """Incremental scanner over a binary json stream.
+    It never holds more in memory than the value currently being read,
+    skipping over values without decoding them.
+    Streams that can not seek (e.g. zstd) are expected at their start, and
+    going back to an offset not buffered anymore then needs reopen:
+    a callable opening the content anew, to read up to that offset.
+    """
+
+    def __init__(
+        self, stream: BinaryIO, reopen: Callable[[], BinaryIO] | None = None
+    ) -> None:
+        self._stream = stream
+        self._reopen = reopen
+        self._reopened: BinaryIO | None = None  # to be closed by the scanner
+        self._reset(stream.tell() if stream.seekable() else 0)
+        self._ensure(len(BOM))
+        if self._buf.startswith(BOM):
+            self._pos = len(BOM)
+
+    def close(self) -> None:
+        """Closes the streams the scanner opened itself"""
+        if self._reopened is not None:
+            self._reopened.close()
+            self._reopened = None
+
+    def _seek(self, offset: int) -> None:
+        if self._stream.seekable():
+            self._stream.seek(offset)
+        else:
+            self._rewind(offset)
+        self._reset(offset)
+
+    def _rewind(self, offset: int) -> None:
+        """Positions a stream that can not seek at the offset,
+        by reopening it and reading up to there"""
+        if self._reopen is None:
+            raise ValueError(
+                "going back in json content that can not seek, "
+                "requires a way to reopen it"
+            )
+        self.close()
+        self._stream = self._reopened = self._reopen()
+        remaining = offset
+        while remaining > 0:
+            skipped = len(self._stream.read(min(remaining, READ_SIZE)))
+            if skipped == 0:
+                raise ValueError(f"json content ends before offset {offset}")
+            remaining -= skipped
+
+    def _reset(self, offset: int) -> None:
+        self._buf = b""
+        self._base = offset  # absolute offset of self._buf[0]
+        self._pos = 0
+        self._mark: int | None = None  # keep buffer from here on
+        self._eof = False
+
+    def tell(self) -> int:
+        return self._base + self._pos
+
+    def seek(self, offset: int) -> None:
+        if self._base <= offset <= self._base + len(self._buf):
+            self._pos = offset - self._base
+            return
+        self._seek(offset)
+
+    def _more(self) -> bool:
+        """Reads the next block from the stream into the buffer,
+        discarding what is no longer needed. Returns False at eof"""
+        if self._eof:
+            return False
+        chunk = self._stream.read(READ_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        keep = self._pos if self._mark is None else self._mark
+        self._buf = self._buf[keep:] + chunk
+        self._base += keep
+        self._pos -= keep
+        if self._mark is not None:
+            self._mark = 0
+        return True
+
+    def _ensure(self, n: int) -> bool:
+        while len(self._buf) - self._pos < n:
+            if not self._more():
+                return False
+        return True
+
+    def _error(self, msg: str) -> ValueError:
+        return ValueError(f"invalid json at offset {self.tell()}: {msg}")
+
+    def peek(self) -> bytes:
+        """Skips whitespace and returns the next character, b'' at eof"""
+        while True:
+            while self._pos < len(self._buf):
+                c = self._buf[self._pos : self._pos + 1]
+                if c not in WHITESPACE:
+                    return c
+                self._pos += 1
+            if not self._more():
+                return b""
+
+    def expect(self, c: bytes) -> None:
+        if self.peek() != c:
+            raise self._error(f"expected {c!r}")
+        self._pos += 1
+
+    def _skip_match(self, regex: re.Pattern) -> None:
+        while True:
+            m = regex.match(self._buf, self._pos)
+            # only trust a match that does not touch the end of the buffer
+            if m is not None and (m.end() < len(self._buf) or self._eof):
+                self._pos = m.end()
+                return
+            if not self._more():
+                if m is None:
+                    raise self._error("unexpected end of content")
+                self._pos = m.end()
+                return
+
+    def skip_value(self) -> None:
+        """Moves past the next value, without decoding it"""
+        c = self.peek()
+        if c == b"":
+            raise self._error("unexpected end of content")
+        if c == b'"':
+            self._skip_match(_STRING)
+            return
+        if c not in b"[{":
+            self._skip_match(_SCALAR)
+            return
+        # container: track depth over the structural characters
+        depth = 0
+        while True:
+            m = _STRUCTURE.search(self._buf, self._pos)
+            if m is None:
+                self._pos = len(self._buf)
+                if not self._more():
+                    raise self._error("unexpected end of content")
+                continue
+            self._pos = m.start()
+            c = m.group()
+            if c == b'"':
+                self._skip_match(_STRING)
+                continue
+            self._pos += 1
+            depth += 1 if c in b"[{" else -1
+            if depth == 0:
+                return
+
+    def read_value(self) -> object:
+        """Decodes the next value"""
+        self.peek()
+        self._mark = self._pos
+        try:
+            self.skip_value()
+            raw = self._buf[self._mark : self._pos]
+        finally:
+            self._mark = None
+        return json.loads(raw.decode("utf-8"))
+
+    def iter_array(self) -> Iterator:
+        """Yields the members of the array starting at the current position"""
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            c = self.peek()
+            self._pos += 1
+            if c == b"]":
+                return
+            if c != b",":
+                raise self._error("expected ',' or ']'")
+
+
+def iter_json_records(
+    stream: BinaryIO, reopen: Callable[[], BinaryIO] | None = None
+) -> Iterator:
+    """Yields the records of a json document one by one.
+
+    Applies the same unwrapping as loading the complete document would:
+    objects with a single key are replaced by their value (unless that
+    is an empty object), until a list is found. Any other value is
+    considered a single record.
+
+    Note that deciding if an object has a single key requires scanning
+    past its first value, so unwrapping costs an extra pass over
+    the content (without decoding it). For streams that can not seek,
+    that pass needs reopen, see JsonScanner.
+    """
+    scanner = JsonScanner(stream, reopen)
+    try:
+        yield from _iter_scanned_records(scanner)
+    finally:
+        scanner.close()
+
+
+def _iter_scanned_records(scanner: JsonScanner) -> Iterator:
+    while True:
+        c = scanner.peek()
+        if c == b"[":
+            yield from scanner.iter_array()
+            return
+        if c != b"{":
+            yield scanner.read_value()
+            return
+        # else check for a single key object to unwrap
+        start = scanner.tell()
+        scanner.expect(b"{")
+        if scanner.peek() == b"}":
+            scanner.seek(start)
+            yield scanner.read_value()
+            return
+        scanner.skip_value()  # the key
+        scanner.expect(b":")
+        value_start = scanner.tell()
+        empty_child = False
+        if scanner.peek() == b"{":
+            scanner.expect(b"{")
+            empty_child = scanner.peek() == b"}"
+            scanner.seek(value_start)
+        scanner.skip_value()
+        if scanner.peek() != b"}" or empty_child:
+            # not to be unwrapped, the object itself is the only record
+            scanner.seek(start)
+            yield scanner.read_value()
+            return
+        # else unwrap: continue with the value
+        log.debug(f"unwrapping single key object at offset {start}")
+        scanner.seek(value_start)
+
+
+def iter_jsonlines_records(stream: BinaryIO) -> Iterator:
+    """Yields the records of a json-lines document, skipping blank lines"""
+    for num, line in enumerate(stream, start=1):
+        if num == 1 and line.startswith(BOM):
+            line = line[len(BOM) :]
+        if not line.strip():
+            continue
+        yield json.loads(line.decode("utf-8"))
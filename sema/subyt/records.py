@@ -0,0 +1,144 @@
+import logging
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+log = logging.getLogger(__name__)
+
+# separator joining the keys of nested records into flattened keys
+FLATTEN_SEPARATOR: str = "."
+# max number of distinct record key-sets to keep key lookups for
+MAX_KEY_LOOKUPS: int = 1024
+
+
+@lru_cache(maxsize=MAX_KEY_LOOKUPS)
+def key_lookup(keys: tuple) -> dict:
+    """The actual keys by their lowercase variant, built once per set of
+    keys (i.e. the schema of the records) and shared by all records having
+    them"""
+    by_lower: dict = dict()
+    for key in keys:
+        if isinstance(key, str):
+            by_lower.setdefault(key.lower(), key)
+    return by_lower
+
+
+def _find(record: dict, key: str, ignorecase: bool) -> tuple:
+    """(True, value) for the key in the record, (False, None) if absent"""
+    if key in record:
+        return True, record[key]
+    if ignorecase:
+        actual = key_lookup(tuple(record)).get(key.lower())
+        if actual is not None:
+            return True, record[actual]
+    return False, None
+
+
+def lookup_path(record: dict, key: str, ignorecase: bool = False) -> tuple:
+    """Looks up the flattened key as a path into the nested records,
+    trying the keys split on the FLATTEN_SEPARATOR from left to right
+    (e.g. 'a.b' finds 1 in {'a': {'b': 1}}).
+
+    :returns: (True, value) if found, else (False, None)
+    """
+    found, value = _find(record, key, ignorecase)
+    if found:
+        return found, value
+    start = 0
+    while (pos := key.find(FLATTEN_SEPARATOR, start)) >= 0:
+        found, nested = _find(record, key[:pos], ignorecase)
+        if found and isinstance(nested, dict):
+            rest = key[pos + len(FLATTEN_SEPARATOR) :]
+            found, value = lookup_path(nested, rest, ignorecase)
+            if found:
+                return found, value
+        start = pos + len(FLATTEN_SEPARATOR)
+    return False, None
+
+
+class Record(dict):
+    """Record (dict) with keys that can also be referenced
+    - ignoring case, through a lookup of the actual keys by their lowercase
+      variant (by_lower)
+    - flattened, joining the keys of the path into its nested records
+      (e.g. 'a.b' for {'a': {'b': 1}})
+    Both are only tried for keys not found as such. The keys themselves,
+    iterating them and dumping the record are as found in the source.
+    """
+
+    __slots__ = ("_by_lower", "_flatten")
+
+    def __init__(
+        self, content: dict, by_lower: dict | None, flatten: bool = False
+    ) -> None:
+        super().__init__(content)
+        self._by_lower = by_lower
+        self._flatten = flatten
+
+    def __missing__(self, key: object) -> object:
+        # only called when the key is not found as such
+        if isinstance(key, str):
+            if self._by_lower is not None:
+                actual = self._by_lower.get(key.lower())
+                if actual is not None and actual != key:
+                    return dict.__getitem__(self, actual)
+            if self._flatten and FLATTEN_SEPARATOR in key:
+                found, value = lookup_path(
+                    self, key, self._by_lower is not None
+                )
+                if found:
+                    return value
+        raise KeyError(key)
+
+    def get(self, key: object, default: object = None) -> object:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __reduce__(self):
+        # e.g. to hand records to worker processes or spill them to disk
+        return (Record, (dict(self), self._by_lower, self._flatten))
+
+
+class RecordTransformer:
+    """Applies the flatten and ignorecase modes to the records of a source,
+    on their way from the Source to the Processor, by wrapping them in a
+    Record resolving such keys when looked up.
+    Records that are not plain dicts (e.g. xml wrappers) are passed as is.
+
+    :param flatten: allow keys of nested records to be referenced flattened
+    :param ignorecase: allow keys to be referenced ignoring case
+    """
+
+    def __init__(self, flatten: bool, ignorecase: bool) -> None:
+        self._flatten = flatten
+        self._ignorecase = ignorecase
+
+    def __repr__(self) -> str:
+        return (
+            f"RecordTransformer(flatten={self._flatten}, "
+            f"ignorecase={self._ignorecase})"
+        )
+
+    @staticmethod
+    def from_settings(generator_settings) -> "RecordTransformer | None":
+        """The transformer for the modes in the GeneratorSettings,
+        None if they need no transformation"""
+        if not (generator_settings.flatten or generator_settings.ignorecase):
+            return None
+        return RecordTransformer(
+            generator_settings.flatten, generator_settings.ignorecase
+        )
+
+    def apply(self, record: object) -> object:
+        """The transformed record"""
+        if type(record) is not dict:
+            return record
+        by_lower = key_lookup(tuple(record)) if self._ignorecase else None
+        return Record(record, by_lower, self._flatten)
+
+    def transform(self, records: Iterable) -> Iterator:
+        """Applies the transformation to the records as they pass"""
+        apply = self.apply
+        for record in records:
+            yield apply(record)
@@ -0,0 +1,183 @@
+import logging
+import os
+import pickle
+import tempfile
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+
+log = logging.getLogger(__name__)
+
+# number of records kept in memory before spilling a set to disk
+SPILL_THRESHOLD: int = 100_000
+
+
+def _is_picklable(item: object) -> bool:
+    try:
+        pickle.loads(pickle.dumps(item, pickle.HIGHEST_PROTOCOL))
+        return True
+    except Exception:
+        return False
+
+
+class MaterializedSet(Iterable):
+    """Reads the wrapped iterable once, on first use, and keeps its records
+    available for any number of independent iterations.
+    Records are kept in a list, or spilled to a temporary file on disk when
+    their number exceeds the spill_threshold.
+
+    :param iterable: the records to materialize
+    :param spill_threshold: number of records to keep in memory at most
+        (None to never spill)
+    """
+
+    def __init__(
+        self,
+        iterable: Iterable,
+        spill_threshold: int | None = SPILL_THRESHOLD,
+    ) -> None:
+        self._source: Iterable | None = iterable
+        self._spill_threshold = spill_threshold
+        self._items: list = []
+        self._spill_path: str | None = None
+        self._count = 0
+
+    def __repr__(self) -> str:
+        state = (
+            "pending"
+            if self._source is not None
+            else f"{self._count} records"
+            + (" on disk" if self._spill_path else "")
+        )
+        return f"{type(self).__name__}({state})"
+
+    @property
+    def materialized(self) -> bool:
+        return self._source is None
+
+    def stream(self) -> Iterator:
+        """Hands out the wrapped iterable for a single pass,
+        without materializing it.
+        Only possible as long as the set has not been iterated yet."""
+        assert not self.materialized, "set already materialized"
+        source, self._source = self._source, None
+        return iter(source)
+
+    def _materialize(self) -> None:
+        if self.materialized:
+            return
+        source = self.stream()
+        spill = None
+        try:
+            for item in source:
+                if spill is not None:
+                    pickle.dump(item, spill, pickle.HIGHEST_PROTOCOL)
+                else:
+                    self._items.append(item)
+                    if self._should_spill():
+                        spill = self._start_spill()
+                self._count += 1
+        finally:
+            if spill is not None:
+                spill.close()
+
+    def _should_spill(self) -> bool:
+        return (
+            self._spill_threshold is not None
+            and self._spill_path is None
+            and len(self._items) > self._spill_threshold
+        )
+
+    def _start_spill(self):
+        if not _is_picklable(self._items[0]):
+            log.warning(
+                "records can not be spilled to disk, keeping them in memory"
+            )
+            self._spill_threshold = None
+            return None
+        spill = tempfile.NamedTemporaryFile(
+            prefix="sema-subyt-set-", suffix=".pickle", delete=False
+        )
+        self._spill_path = spill.name
+        log.debug(f"spilling set to {self._spill_path}")
+        for item in self._items:
+            pickle.dump(item, spill, pickle.HIGHEST_PROTOCOL)
+        self._items = []
+        return spill
+
+    def _iter_spilled(self) -> Iterator:
+        with open(self._spill_path, "rb") as spill:
+            while True:
+                try:
+                    yield pickle.load(spill)
+                except EOFError:
+                    return
+
+    def __iter__(self) -> Iterator:
+        self._materialize()
+        if self._spill_path is None:
+            return iter(self._items)
+        return self._iter_spilled()
+
+    def __len__(self) -> int:
+        self._materialize()
+        return self._count
+
+    def close(self) -> None:
+        """Releases the records, removing any spilled content from disk"""
+        if self._spill_path is not None:
+            os.unlink(self._spill_path)
+            self._spill_path = None
+        self._items = []
+
+
+def _index_key(value: object) -> object:
+    """Normalizes values to use as key in an index
+    (e.g. xml wrappers or other containers are used by their str value)"""
+    if isinstance(value, (Mapping, list)) or not isinstance(value, Hashable):
+        return str(value)
+    return value
+
+
+class IndexedSet(MaterializedSet):
+    """MaterializedSet that also indexes its records by the value of
+    one of their fields, allowing lookups in constant time.
+    Multiple records can share the same key value.
+    The records are kept in memory, as the index refers to them anyway.
+
+    :param iterable: the records to materialize
+    :param key_name: name of the field to index the records on
+    """
+
+    def __init__(self, iterable: Iterable, key_name: str) -> None:
+        super().__init__(iterable, spill_threshold=None)
+        self._key_name = key_name
+        self._index: dict | None = None
+
+    def __repr__(self) -> str:
+        return f"{super().__repr__()[:-1]}, index='{self._key_name}')"
+
+    def _build_index(self) -> dict:
+        if self._index is None:
+            self._materialize()
+            index: dict = dict()
+            for item in self._items:
+                try:
+                    key = _index_key(item[self._key_name])
+                except (KeyError, AttributeError):
+                    log.debug(f"record without '{self._key_name}': {item}")
+                    continue
+                index.setdefault(key, []).append(item)
+            self._index = index
+        return self._index
+
+    def get(self, key: object, default: object = None) -> object:
+        """The first record having the key value, or default if none"""
+        found = self._build_index().get(_index_key(key))
+        return found[0] if found else default
+
+    def getall(self, key: object) -> list:
+        """All records having the key value (in source order)"""
+        return list(self._build_index().get(_index_key(key), []))
+
+    def close(self) -> None:
+        self._index = None
+        super().close()
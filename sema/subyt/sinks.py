@@ -1,13 +1,33 @@
+import io
+import json
 import logging
 import os
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from rdflib import Graph
 from uritemplate import URITemplate, variables
 
+from sema.commons.store import RDFStore, URIRDFStore
+
 from .api import Sink
+from .checkpoint import CHECKPOINT_SUFFIX
+from .compression import (
+    WRITE_BUFFER_SIZE,
+    compression_of,
+    open_reader,
+    open_writer,
+)
 
 log = logging.getLogger(__name__)
 
+# size of the chunks copied while merging the parts of sharded output
+MERGE_CHUNK_SIZE: int = 1 << 20
+
 
 def assert_writable(path_name: str | Path, force_output: bool = False):
     out_path = Path(path_name)
@@ -23,34 +43,87 @@ def assert_writable(path_name: str | Path, force_output: bool = False):
     )
 
 
+def shard_path(path_name: str | Path, shard: int, shards: int) -> str:
+    """The path for the output of one shard out of a number of them,
+    inserting the shard in the file name (e.g. out.shard-0-of-4.ttl.gz
+    for out.ttl.gz) so the suffixes stay in place"""
+    path = Path(path_name)
+    stem, dot, suffixes = path.name.partition(".")
+    name = f"{stem}.shard-{shard}-of-{shards}{dot}{suffixes}"
+    return str(path.with_name(name))
+
+
 class SinkFactory:
     @staticmethod
     def make_sink(
         identifier: str,
         force_output: bool = False,
         allow_repeated_sink_paths: bool = False,
+        incremental: bool = False,
+        prune: bool = False,
+        writers: int = 0,
+        archive: str | None = None,
+        rotate_records: int = 0,
+        rotate_bytes: int = 0,
+        shard: tuple | None = None,
     ) -> Sink:
         identifier = identifier or "-"
+        options = {
+            "repeated sink paths": allow_repeated_sink_paths,
+            "incremental output": incremental,
+            "pruning output": prune,
+            "background writers": writers,
+            "archive output": archive,
+        }
+        if identifier.startswith(StoreSink.SCHEME_PREFIX):
+            SinkFactory._warn_unsupported("StoreSink", options)
+            return StoreSink.from_identifier(identifier, force_output)
+        # else:
+        pattern_variables = variables(identifier)
+        rotating = rotate_records > 0 or rotate_bytes > 0
+        if rotating and pattern_variables != {RotatingFileSink.PART_VARIABLE}:
+            log.warning(
+                "rotating output requires a sink name with only a "
+                f"{{{RotatingFileSink.PART_VARIABLE}}} pattern, ignoring..."
+            )
+            rotating = False
         if identifier == "-":
-            if allow_repeated_sink_paths:
-                log.warning(
-                    "repeated sink paths do not apply to StdOutSink, "
-                    "ignoring..."
-                )
+            SinkFactory._warn_unsupported("StdOutSink", options)
             return StdOutSink()
         # else:
-        if len(variables(identifier)) == 0:  # identifier is not a pattern
-            if allow_repeated_sink_paths:
-                log.warning(
-                    "repeated sink paths do not apply to SingleFileSink, "
-                    "ignoring..."
-                )
+        if rotating:  # identifier is a pattern for numbered files
+            SinkFactory._warn_unsupported("RotatingFileSink", options)
+            if shard is not None:  # every shard its own series of files
+                identifier = shard_path(identifier, *shard)
+            return RotatingFileSink(
+                identifier,
+                force_output,
+                rotate_records=rotate_records,
+                rotate_bytes=rotate_bytes,
+            )
+        if len(pattern_variables) == 0:  # identifier is not a pattern
+            SinkFactory._warn_unsupported("SingleFileSink", options)
+            if shard is not None:  # a part to merge with the other shards
+                return ShardFileSink(identifier, *shard, force_output)
             return SingleFileSink(identifier, force_output)
         # else:                                        #identifier is a pattern
+        #   (the records of each shard simply end up in their own files)
         return PatternedFileSink(
-            identifier, force_output, allow_repeated_sink_paths
+            identifier,
+            force_output,
+            allow_repeated_sink_paths,
+            incremental=incremental,
+            prune=prune,
+            writers=writers,
+            archive=archive,
         )
 
+    @staticmethod
+    def _warn_unsupported(sink_type: str, options: dict):
+        for name, value in options.items():
+            if value:
+                log.warning(f"{name} do not apply to {sink_type}, ignoring...")
+
 
 class StdOutSink(Sink):
     def __init__(self):
@@ -76,10 +149,14 @@ class StdOutSink(Sink):
 
 class SingleFileSink(Sink):
     def __init__(self, path_name: str, force_output: bool = False):
+        """Sink writing all parts to one file,
+        compressed according to its suffix (.gz, .bz2, .xz or .zst)"""
         super().__init__()
         assert_writable(path_name, force_output)
         self._file_path: Path = Path(path_name)
         self._force_output = force_output
+        self._fopen = None
+        self._resume_offset: int | None = None
         if self._file_path.exists():
             self.mtimes = {
                 str(self._file_path): self._file_path.stat().st_mtime
@@ -91,14 +168,278 @@ class SingleFileSink(Sink):
             f"{self._force_output})"
         )
 
+    @property
+    def checkpoint_path(self) -> Path | None:
+        # compressed output can not be cut at an offset to continue from
+        if compression_of(self._file_path) is not None:
+            return None
+        return Path(f"{self._file_path}{CHECKPOINT_SUFFIX}")
+
+    def checkpoint(self) -> dict:
+        self._fopen.flush()
+        os.fsync(self._fopen.fileno())
+        return dict(offset=self._fopen.tell())
+
+    def resume(self, state: dict) -> None:
+        offset = state["offset"]
+        if not self._file_path.is_file():
+            raise ValueError(f"File to resume '{self._file_path}' is gone")
+        if self._file_path.stat().st_size < offset:
+            raise ValueError(
+                f"File to resume '{self._file_path}' is shorter than "
+                f"the checkpoint at {offset}"
+            )
+        self._resume_offset = offset
+
+    def open(self):
+        if self._resume_offset is None:
+            self._fopen = open_writer(self._file_path)
+            return
+        # else continue at the offset, dropping what was written after it
+        self._fopen = open(self._file_path, "r+b", WRITE_BUFFER_SIZE)
+        self._fopen.truncate(self._resume_offset)
+        self._fopen.seek(self._resume_offset)
+        self._resume_offset = None
+
+    def close(self):
+        if self._fopen:
+            self._fopen.close()
+        self._fopen = None
+
+    def add(
+        self,
+        part: str,
+        item: dict | None = None,
+        source_mtime: float | None = None,
+    ):
+        assert self._fopen is not None, "File to Sink to already closed"
+        log.debug(f"SingleFileSink adding part to {self._file_path}")
+        self._fopen.write(part.encode("utf-8"))
+
+
+class ShardFileSink(SingleFileSink):
+    # suffix of the file describing a part, next to it
+    INFO_SUFFIX: str = ".json"
+    # parts are counted per record, so empty shards can be recognised
+    per_record: bool = True
+
+    def __init__(
+        self,
+        path_name: str,
+        shard: int,
+        shards: int,
+        force_output: bool = False,
+    ):
+        """Sink writing the output of one shard to a part file, named by
+        inserting the shard in the path_name (see shard_path()), next to a
+        .json file describing it. Each part is rendered as a complete file
+        (its records get their own isFirst/isLast), once all shards are done
+        merge() rebuilds the single file, keeping only the header and footer
+        declared by the template at its start and end."""
+        super().__init__(shard_path(path_name, shard, shards), force_output)
+        self._shard = shard
+        self._shards = shards
+        self._header: str = ""
+        self._footer: str = ""
+        self._resume_records = 0
+        self.records = 0
+
+    def __repr__(self):
+        return (
+            f"ShardFileSink('{str(self._file_path.resolve())}', "
+            f"{self._shard}/{self._shards}, {self._force_output})"
+        )
+
+    def set_header(self, header: str) -> None:
+        self._header = header
+
+    def set_footer(self, footer: str) -> None:
+        self._footer = footer
+
+    def checkpoint(self) -> dict:
+        return dict(super().checkpoint(), records=self.records)
+
+    def resume(self, state: dict) -> None:
+        super().resume(state)
+        self._resume_records = state["records"]
+
+    def open(self):
+        self.records, self._resume_records = self._resume_records, 0
+        super().open()
+
+    def close(self):
+        if self._fopen:
+            info = dict(
+                shard=self._shard,
+                shards=self._shards,
+                records=self.records,
+                header=self._header,
+                footer=self._footer,
+            )
+            info_path = Path(f"{self._file_path}{ShardFileSink.INFO_SUFFIX}")
+            info_path.write_text(json.dumps(info))
+        super().close()
+
+    def add(
+        self,
+        part: str,
+        item: dict | None = None,
+        source_mtime: float | None = None,
+    ):
+        super().add(part, item, source_mtime)
+        if item is not None:
+            self.records += 1
+
+    @staticmethod
+    def merge(
+        path_name: str | Path, shards: int, force_output: bool = False
+    ) -> None:
+        """Merges the parts written by all shards into the single file.
+        Parts of shards without records are left out (unless all are).
+
+        :param path_name: the file to write, as passed to each shard
+        :param shards: the number of shards
+        """
+        assert_writable(path_name, force_output)
+        parts = [Path(shard_path(path_name, i, shards)) for i in range(shards)]
+        infos = list()
+        for part in parts:
+            info_path = Path(f"{part}{ShardFileSink.INFO_SUFFIX}")
+            if not info_path.exists():
+                raise ValueError(
+                    f"Part '{part}' of the shards to merge is missing"
+                )
+            infos.append(json.loads(info_path.read_text()))
+        filled = [(p, i) for p, i in zip(parts, infos) if i["records"] > 0]
+        log.info(f"Merging {len(filled)} non-empty shards into {path_name}")
+        with open_writer(path_name) as out:
+            if not filled:  # just as rendered for no records at all
+                ShardFileSink._copy_body(parts[0], b"", b"", out)
+                return
+            # else
+            header = filled[0][1]["header"].encode("utf-8")
+            footer = filled[0][1]["footer"].encode("utf-8")
+            out.write(header)
+            for part, _ in filled:
+                ShardFileSink._copy_body(part, header, footer, out)
+            out.write(footer)
+
+    @staticmethod
+    def _copy_body(part: Path, header: bytes, footer: bytes, out) -> None:
+        # copies the part, leaving out the header and footer it holds
+        with open_reader(part) as fin:
+            pending = fin.read(len(header))
+            if pending == header:
+                pending = b""
+            else:
+                log.warning(f"Header of the template not found in {part}")
+            while chunk := fin.read(MERGE_CHUNK_SIZE):
+                pending += chunk
+                # hold back what could be the footer
+                cut = len(pending) - len(footer)
+                if cut > 0:
+                    out.write(pending[:cut])
+                    pending = pending[cut:]
+            if pending.endswith(footer):
+                pending = pending[: len(pending) - len(footer)]
+            else:
+                log.warning(f"Footer of the template not found in {part}")
+            out.write(pending)
+
+
+class RotatingFileSink(Sink):
+    # name of the variable in the name pattern numbering the files
+    PART_VARIABLE: str = "part"
+
+    def __init__(
+        self,
+        name_pattern: str,
+        force_output: bool = False,
+        *,
+        rotate_records: int = 0,
+        rotate_bytes: int = 0,
+    ):
+        """Sink writing all parts to a series of files, named by expanding
+        the {part} in the name_pattern with their number (starting at 0).
+        Files are compressed according to their suffix.
+        Every file but the first starts with the header declared by the
+        template, so each of them can be parsed independently
+        (the first one gets the header the template renders itself).
+
+        :param rotate_records: max number of parts (records) to write to
+            one file
+        :param rotate_bytes: number of (uncompressed) bytes after which to
+            move to a next file
+        """
+        super().__init__()
+        assert (
+            rotate_records > 0 or rotate_bytes > 0
+        ), "RotatingFileSink requires rotate_records or rotate_bytes"
+        self._name_template = URITemplate(name_pattern)
+        self._force_output = force_output
+        self._rotate_records = rotate_records
+        self._rotate_bytes = rotate_bytes
+        # rotating by records counts parts: one per record, not per batch
+        self.per_record = rotate_records > 0
+        self._header: bytes = b""
+        self._fopen = None
+        self._part = -1
+        self._records = 0
+        self._bytes = 0
+        first_path = Path(self.part_path(0))
+        assert_writable(first_path, force_output)
+        if first_path.exists():
+            self.mtimes = {str(first_path): first_path.stat().st_mtime}
+
+    def __repr__(self):
+        return (
+            f"RotatingFileSink('{self._name_template.uri}', "
+            f"{self._force_output})"
+        )
+
+    def part_path(self, part: int) -> str:
+        return self._name_template.expand(
+            {RotatingFileSink.PART_VARIABLE: part}
+        )
+
+    def set_header(self, header: str) -> None:
+        if header and not header.endswith("\n"):
+            header += "\n"
+        self._header = header.encode("utf-8")
+
     def open(self):
-        self._fopen = open(self._file_path, "w", encoding="utf-8")
+        self._part = -1
+        self._next_part()
 
     def close(self):
         if self._fopen:
             self._fopen.close()
         self._fopen = None
 
+    def _next_part(self):
+        self.close()
+        self._part += 1
+        file_path = self.part_path(self._part)
+        assert_writable(file_path, self._force_output)
+        log.info(f"Creating {file_path}")
+        self._fopen = open_writer(file_path)
+        self._records = 0
+        self._bytes = 0
+        if self._part > 0 and self._header:
+            self._write(self._header)
+
+    def _write(self, data: bytes):
+        self._fopen.write(data)
+        self._bytes += len(data)
+
+    def _is_full(self) -> bool:
+        if self._records == 0:
+            return False
+        return (
+            0 < self._rotate_records <= self._records
+            or 0 < self._rotate_bytes <= self._bytes
+        )
+
     def add(
         self,
         part: str,
@@ -106,23 +447,185 @@ class SingleFileSink(Sink):
         source_mtime: float | None = None,
     ):
         assert self._fopen is not None, "File to Sink to already closed"
-        log.info(f"SingleFileSink adding part to {self._file_path}")
-        self._fopen.write(part)
+        if self._is_full():
+            self._next_part()
+        self._write(part.encode("utf-8"))
+        self._records += 1
+
+
+class ChangeManifest:
+    """Keeps track of the fingerprint of the record that produced
+    each output file, persisted as json in the given manifest file.
+    """
+
+    def __init__(self, manifest_path: Path) -> None:
+        self._path = manifest_path
+        self._entries: dict = dict()
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f).get("entries", {})
+
+    def __repr__(self) -> str:
+        return f"ChangeManifest('{self._path}')"
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._entries
+
+    def get(self, file_path: str) -> str | None:
+        return self._entries.get(file_path)
+
+    def set(self, file_path: str, fingerprint: str) -> None:
+        self._entries[file_path] = fingerprint
+
+    def remove(self, file_path: str) -> None:
+        self._entries.pop(file_path, None)
+
+    def paths(self) -> list:
+        return list(self._entries.keys())
+
+    def save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self._entries}, f)
+        os.replace(tmp_path, self._path)
+
+
+class ArchiveWriter:
+    """Packs the written files as entries in a single tar or zip archive,
+    the kind of archive is derived from the archive file extension.
+    """
+
+    # tarfile write modes per supported (compressed) tar extension
+    TAR_MODES: dict = {
+        ".tar": "w",
+        ".tar.gz": "w:gz",
+        ".tgz": "w:gz",
+        ".tar.bz2": "w:bz2",
+        ".tar.xz": "w:xz",
+    }
+
+    def __init__(self, archive_path: str, force_output: bool = False):
+        assert_writable(archive_path, force_output)
+        self._path = archive_path
+        self._tar = None
+        self._zip = None
+        name = Path(archive_path).name.lower()
+        if name.endswith(".zip"):
+            self._zip = zipfile.ZipFile(
+                archive_path, "w", compression=zipfile.ZIP_DEFLATED
+            )
+            return
+        for ext, mode in ArchiveWriter.TAR_MODES.items():
+            if name.endswith(ext):
+                self._tar = tarfile.open(archive_path, mode)
+                return
+        raise ValueError(
+            f"Unsupported archive type for '{archive_path}', use one of "
+            f"{[*ArchiveWriter.TAR_MODES, '.zip']}"
+        )
+
+    def __repr__(self):
+        return f"ArchiveWriter('{self._path}')"
+
+    @staticmethod
+    def entry_name(file_path: str) -> str:
+        return Path(file_path).as_posix().lstrip("/")
+
+    def write(self, file_path: str, part: str) -> None:
+        name = ArchiveWriter.entry_name(file_path)
+        data = part.encode("utf-8")
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+            return
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        for archive in (self._zip, self._tar):
+            if archive is not None:
+                archive.close()
+        self._zip = self._tar = None
 
 
 class PatternedFileSink(Sink):
+    # every part ends up in its own file, so order is irrelevant
+    ordered: bool = False
+    # and the file name is derived from the record
+    per_record: bool = True
+    # name of the manifest file for incremental output
+    MANIFEST_NAME: str = ".subyt-manifest.json"
+    # name of the checkpoint file of a job, next to the manifest
+    CHECKPOINT_NAME: str = ".subyt-checkpoint.json"
+    # name of the log of the paths expanded to, next to the checkpoint
+    PATHS_LOG_NAME: str = ".subyt-checkpoint-paths.jsonl"
+    # max number of parts waiting to be written, per writer thread
+    QUEUE_PER_WRITER: int = 64
+
     def __init__(
         self,
         name_pattern: str,
         force_output: bool = False,
         allow_repeated_sink_paths: bool = False,
+        *,
+        incremental: bool = False,
+        prune: bool = False,
+        writers: int = 0,
+        archive: str | None = None,
     ):
+        """Sink writing the part for each record to its own file, named by
+        expanding the name_pattern with the record.
+
+        :param incremental: keep a manifest of the records used for each
+            file, so only files for new or changed records get rendered
+        :param prune: with incremental, remove the files created for
+            records (according to the manifest) not found anymore
+        :param writers: number of background threads writing the files
+            (default 0: write synchronously while adding)
+        :param archive: path to a tar or zip archive to pack all files in,
+            rather than writing them individually
+        """
         super().__init__()
         self._name_template = URITemplate(name_pattern)
         self._force_output = force_output
         self._allow_repeated_sink_paths = allow_repeated_sink_paths
-        self._file_paths = []
+        self._path_counts: dict = dict()  # times each path was expanded to
+        self._unlogged: list | None = None  # paths counted since checkpoint
+        self._created_folders: set = set()  # folders known to be writable
         self.mtimes = None
+        if archive and incremental:
+            log.warning("incremental output does not apply to archives")
+            incremental = prune = False
+        self.incremental = incremental
+        self._prune = prune
+        self._manifest: ChangeManifest | None = None
+        self._pending: dict = dict()  # fingerprints of files to be written
+        self._seen_paths: set = set()  # files (to be) kept in this run
+        if incremental:
+            self._manifest = ChangeManifest(
+                PatternedFileSink.manifest_folder(name_pattern)
+                / PatternedFileSink.MANIFEST_NAME
+            )
+        self._writers = writers
+        self._archive_path = archive
+        self._archive: ArchiveWriter | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: threading.BoundedSemaphore | None = None
+        self._write_errors: list = []
+
+    @property
+    def record_fields(self) -> set:
+        return set(self._name_template.variable_names)
+
+    @staticmethod
+    def manifest_folder(name_pattern: str) -> Path:
+        """The folder holding all files matching the pattern"""
+        static_part = name_pattern.split("{", 1)[0]
+        if static_part.endswith(("/", os.sep)):
+            return Path(static_part)
+        return Path(static_part).parent
 
     def __repr__(self):
         return (
@@ -130,34 +633,218 @@ class PatternedFileSink(Sink):
             f"'{self._name_template.uri}', {self._force_output})"
         )
 
+    @property
+    def checkpoint_path(self) -> Path | None:
+        # archives are written as a whole, and records skipped on resume
+        #   would be pruned from an incremental output
+        if self._archive_path or self.incremental:
+            return None
+        return (
+            PatternedFileSink.manifest_folder(self._name_template.uri)
+            / PatternedFileSink.CHECKPOINT_NAME
+        )
+
+    def _paths_log(self) -> Path:
+        return self.checkpoint_path.with_name(PatternedFileSink.PATHS_LOG_NAME)
+
+    def checkpoint(self) -> dict:
+        self._wait_written()
+        self._raise_write_errors()
+        # all paths expanded to are needed to keep detecting (or numbering)
+        #   repeats, only those since the last checkpoint are appended
+        if self._unlogged is None:  # first checkpoint, starting over
+            mode = "wb"
+            paths = [p for p, n in self._path_counts.items() for _ in range(n)]
+        else:
+            mode = "ab"
+            paths = self._unlogged
+        with open(self._paths_log(), mode) as f:
+            f.writelines(f"{json.dumps(p)}\n".encode("utf-8") for p in paths)
+            size = f.tell()
+        self._unlogged = []
+        return dict(paths_size=size)
+
+    def resume(self, state: dict) -> None:
+        with open(self._paths_log(), "r+b") as f:
+            # dropping paths logged after the checkpoint was saved
+            f.truncate(state["paths_size"])
+            for line in f:
+                self._count_path(json.loads(line))
+        self._unlogged = []
+        # files of records after the checkpoint may exist from the last run
+        self._force_output = True
+
+    def _wait_written(self) -> None:
+        """Waits for the background writers to write all queued files"""
+        if self._pool is None:
+            return
+        slots = self._writers * PatternedFileSink.QUEUE_PER_WRITER
+        for _ in range(slots):
+            self._slots.acquire()
+        for _ in range(slots):
+            self._slots.release()
+
     def open(self):
-        pass
+        if self._archive_path:
+            self._archive = ArchiveWriter(
+                self._archive_path, self._force_output
+            )
+        # archive entries are appended one at a time, by a single writer
+        writers = min(self._writers, 1) if self._archive else self._writers
+        if writers > 0:
+            self._pool = ThreadPoolExecutor(
+                max_workers=writers, thread_name_prefix="subyt-sink"
+            )
+            self._slots = threading.BoundedSemaphore(
+                writers * PatternedFileSink.QUEUE_PER_WRITER
+            )
 
     def close(self):
-        pass
+        try:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+        finally:
+            if self._manifest is not None:
+                if self._prune:
+                    self._prune_vanished()
+                self._manifest.save()
+        if self._unlogged is not None:  # done, no need to resume
+            self._paths_log().unlink(missing_ok=True)
+        self._raise_write_errors()
 
-    def _add(
-        self, file_path: str, part: str, source_mtime: float | None = None
-    ):
-        out_path: Path = Path(file_path)
-        if out_path.exists() and out_path.is_dir():
+    def _prune_vanished(self):
+        for file_path in self._manifest.paths():
+            if file_path in self._seen_paths:
+                continue
+            log.info(f"Removing {file_path} as its record is gone")
+            Path(file_path).unlink(missing_ok=True)
+            self._manifest.remove(file_path)
+
+    def is_unchanged(self, item: dict | None, fingerprint: str) -> bool:
+        if self._manifest is None or item is None:
+            return False
+        file_path = self._next_file_path(item)
+        if file_path is None:
+            return False  # not allowed, leave it to add() to complain
+        if (
+            self._manifest.get(file_path) == fingerprint
+            and Path(file_path).is_file()
+        ):
+            self._seen_paths.add(file_path)
+            self._count_path(self._name_template.expand(item))
+            return True
+        # else to be rendered and added
+        self._pending[file_path] = fingerprint
+        return False
+
+    def _count_path(self, file_path: str) -> None:
+        self._path_counts[file_path] = self._path_counts.get(file_path, 0) + 1
+        if self._unlogged is not None:
+            self._unlogged.append(file_path)
+
+    def _next_file_path(self, item: dict) -> str | None:
+        """The file path for the next item,
+        None if that is a repeated path that is not allowed"""
+        return self._extend_path(self._name_template.expand(item))
+
+    def _extend_path(self, file_path: str) -> str | None:
+        count = self._path_counts.get(file_path, 0)
+        if count == 0:
+            return file_path
+        if not self._allow_repeated_sink_paths:
+            return None
+        return f"{file_path}_{count - 1}"
+
+    def _ensure_folder(self, folder: Path) -> None:
+        """Creates the folder once, subsequent calls are a set lookup"""
+        if folder in self._created_folders:
+            return
+        folder.mkdir(parents=True, exist_ok=True)
+        assert os.access(folder, os.W_OK), (
+            f"Can not write to folder '{folder}' for creating new files",
+        )
+        self._created_folders.add(folder)
+
+    def _submit(self, write_fn, *args) -> None:
+        """Writes directly, or queues the write for the background writers,
+        blocking while the queue is full"""
+        if self._pool is None:
+            write_fn(*args)
+            return
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(write_fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._written)
+
+    def _written(self, future) -> None:
+        self._slots.release()
+        if future.exception() is not None:
+            self._write_errors.append(future.exception())
+
+    def _raise_write_errors(self) -> None:
+        if self._write_errors:
+            error = self._write_errors[0]
+            self._write_errors = []
+            raise error
+
+    def _write_file(
+        self, file_path: str, part: str, fingerprint: str | None
+    ) -> None:
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(part)
+        except IsADirectoryError:
             log.warning(
                 f"Skipping creation of {file_path} as it is a directory. "
             )
             return
-        # else
-        sink_mtime = out_path.stat().st_mtime if out_path.exists() else 0
-        if source_mtime and (source_mtime < sink_mtime):
-            log.info(
-                f"Aborting creation of {file_path} "
-                f"(source_mtime = {source_mtime}; sink_mtime = {sink_mtime})"
-            )
+        if fingerprint is not None:
+            self._manifest.set(file_path, fingerprint)
+
+    def _add(
+        self, file_path: str, part: str, source_mtime: float | None = None
+    ):
+        self._seen_paths.add(file_path)
+        if self._archive is not None:
+            log.info(f"Adding {file_path} to {self._archive}")
+            self._submit(self._archive.write, file_path, part)
             return
         # else
-        assert_writable(file_path, self._force_output)
+        out_path: Path = Path(file_path)
+        if source_mtime or not self._force_output:  # existing files matter
+            if out_path.is_dir():
+                log.warning(
+                    f"Skipping creation of {file_path} as it is a directory. "
+                )
+                return
+            sink_mtime = out_path.stat().st_mtime if out_path.exists() else 0
+            if source_mtime and (source_mtime < sink_mtime):
+                log.info(
+                    f"Aborting creation of {file_path} "
+                    f"(source_mtime = {source_mtime}; "
+                    f"sink_mtime = {sink_mtime})"
+                )
+                return
+            # files in the manifest were written by earlier runs: ours
+            owned = self._manifest is not None and file_path in self._manifest
+            if not (self._force_output or owned):
+                assert not out_path.exists(), (
+                    f"File to write '{file_path}' already exists",
+                )
+        # else
+        self._ensure_folder(out_path.parent.absolute())
         log.info(f"Creating {file_path}")
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(part)
+        fingerprint = self._pending.pop(file_path, None)
+        if self._manifest is None:
+            fingerprint = None
+        self._submit(self._write_file, file_path, part, fingerprint)
 
     def add(
         self,
@@ -166,6 +853,7 @@ class PatternedFileSink(Sink):
         source_mtime: float | None = None,
     ):
         assert item is not None, "No data context available to expand template"
+        self._raise_write_errors()  # fail early on background write errors
         for template_var in self._name_template.variables:
             for var_name in template_var.variable_names:
                 if (
@@ -178,19 +866,118 @@ class PatternedFileSink(Sink):
                         "It is however not present in the current item."
                     )
         file_path = self._name_template.expand(item)
-        if self._allow_repeated_sink_paths:
-            extended_file_path = file_path[:]
-            if file_path in self._file_paths:
-                extended_file_path = (
-                    f"{file_path}_{self._file_paths.count(file_path) - 1}"
-                )
-            self._add(extended_file_path, part, source_mtime)
-        else:
-            if file_path in self._file_paths:
-                raise RuntimeError(
-                    f"{file_path} was already created in this process, "
-                    "make sure data items are not duplicated or "
-                    "set allow_repeated_sink_paths to True"
-                )
-            self._add(file_path, part, source_mtime)
-        self._file_paths.append(file_path)
+        extended_file_path = self._extend_path(file_path)
+        if extended_file_path is None:
+            raise RuntimeError(
+                f"{file_path} was already created in this process, "
+                "make sure data items are not duplicated or "
+                "set allow_repeated_sink_paths to True"
+            )
+        self._add(extended_file_path, part, source_mtime)
+        self._count_path(file_path)
+
+
+class StoreSink(Sink):
+    # prefix of sink identifiers like sparql+http://host/sparql#named-graph
+    SCHEME_PREFIX: str = "sparql+"
+    # number of triples collected before inserting them in the store
+    BATCH_SIZE: int = 10_000
+
+    def __init__(
+        self,
+        store: RDFStore,
+        named_graph: str,
+        force_output: bool = False,
+        *,
+        batch_size: int = BATCH_SIZE,
+    ):
+        """Sink parsing the parts (turtle or n-triples) and inserting their
+        triples in batches into the named_graph of the store.
+        Prefixes declared in earlier parts (or in the template header)
+        remain in use for parsing the later parts.
+        The lastmod of the named_graph serves as mtime of the sink.
+
+        :param force_output: replace the named_graph if the store has it
+        :param batch_size: number of triples to insert at once
+        """
+        super().__init__()
+        self._store = store
+        self._named_graph = named_graph
+        self._force_output = force_output
+        self._batch_size = batch_size
+        self._buffer: Graph | None = None
+        self._prefixes: dict = dict()  # declared in the parts so far
+        self._preamble = ""  # the prefixes as turtle declarations
+        self._inserted = 0
+        lastmod = store.lastmod_ts(named_graph)
+        if lastmod is not None:
+            self.mtimes = {named_graph: lastmod.timestamp()}
+
+    @staticmethod
+    def from_identifier(identifier: str, force_output: bool = False):
+        """StoreSink for an identifier like sparql+<endpoint>#<named-graph>
+        the endpoint serving for both queries and updates"""
+        url = identifier[len(StoreSink.SCHEME_PREFIX) :]
+        endpoint, _, named_graph = url.partition("#")
+        assert named_graph, (
+            f"StoreSink '{identifier}' requires a #named-graph",
+        )
+        return StoreSink(
+            URIRDFStore(endpoint, endpoint), named_graph, force_output
+        )
+
+    def __repr__(self):
+        return f"StoreSink({self._store}, '{self._named_graph}')"
+
+    def set_header(self, header: str) -> None:
+        graph = Graph(bind_namespaces="none")
+        self._collect_prefixes(graph.parse(data=header, format="turtle"))
+
+    def _collect_prefixes(self, graph: Graph) -> None:
+        known = len(self._prefixes)
+        for prefix, namespace in graph.namespaces():
+            self._prefixes.setdefault(prefix, str(namespace))
+        if len(self._prefixes) != known:
+            self._preamble = "".join(
+                f"@prefix {prefix}: <{namespace}> .\n"
+                for prefix, namespace in self._prefixes.items()
+            )
+
+    def open(self):
+        if self._store.lastmod_ts(self._named_graph) is not None:
+            assert self._force_output, (
+                f"Named graph '{self._named_graph}' already in the store",
+            )
+            log.info(f"Replacing {self._named_graph} in {self._store}")
+            self._store.drop_graph(self._named_graph)
+        self._buffer = Graph(bind_namespaces="none")
+        self._inserted = 0
+
+    def _flush(self):
+        if len(self._buffer) == 0:
+            return
+        log.debug(f"inserting {len(self._buffer)} triples")
+        self._store.insert(self._buffer, self._named_graph)
+        self._inserted += len(self._buffer)
+        self._buffer = Graph(bind_namespaces="none")
+
+    def close(self):
+        if self._buffer is not None:
+            self._flush()
+            log.info(
+                f"Inserted {self._inserted} triples "
+                f"into {self._named_graph}"
+            )
+        self._buffer = None
+
+    def add(
+        self,
+        part: str,
+        item: dict | None = None,
+        source_mtime: float | None = None,
+    ):
+        assert self._buffer is not None, "Store to Sink to already closed"
+        self._buffer.parse(data=self._preamble + part, format="turtle")
+        self._collect_prefixes(self._buffer)
+        if len(self._buffer) >= self._batch_size:
+            self._flush()
@@ -5,9 +5,10 @@ from typing import Dict
 from sema.commons.service import ServiceBase, ServiceResult, Trace
 
 from .api import GeneratorSettings
+from .checkpoint import CHECKPOINT_INTERVAL
 from .j2.generator import JinjaBasedGenerator
 from .sinks import SinkFactory
-from .sources import SourceFactory
+from .sources import SourceFactory, parse_shard
 
 log = logging.getLogger(__name__)
 
@@ -29,7 +30,7 @@ class Subyt(ServiceBase):
     def __init__(
         self,
         *,
-        template_name: str,
+        template_name: str | None = None,
         template_folder: str,
         source: str | None = None,
         extra_sources: Dict[str, str] | None = None,
@@ -41,12 +42,27 @@ class Subyt(ServiceBase):
         variables: Dict[str, str] = {},
         mode: str = "it",
         unique_pattern: str | None = None,
+        dedupe: str | None = None,
+        workers: int | str = 1,
+        incremental: bool | str = False,
+        prune: bool | str = False,
+        writers: int | str = 0,
+        archive: str | None = None,
+        rotate_records: int | str = 0,
+        rotate_bytes: int | str = 0,
+        batch_size: int | str = 0,
+        targets: list | None = None,
+        shard: str | None = None,
+        shard_key: str | None = None,
+        checkpoint: int | str = 0,
+        resume: bool | str = False,
     ) -> None:
         """Initialize the Subyt Service object
 
         :param template_name: the name of the template to be used,
             this should match a filename in the template_folder
-        :type template_name: str
+            Can be omitted when targets are given.
+        :type template_name: str | None
         :param template_folder: the folder where the template is located
         :type template_folder: str
         :param source: the source file to be used
@@ -56,6 +72,8 @@ class Subyt(ServiceBase):
         :type extra_sources: Dict[str, str]
         :param sink: the sink file to be used
             Can be relative to the current working directory
+            Can be sparql+<endpoint>#<named-graph> to insert the triples
+            directly into that named graph of a triple store
         :type sink: str
         :param overwrite_sink: overwrites the sink file even if it exists
         :type overwrite_sink: bool | str
@@ -83,15 +101,80 @@ class Subyt(ServiceBase):
         :type mode: str
         :param unique_pattern: the pattern evaluated to filter unique records
         :type unique_pattern: str | None
+        :param dedupe: how to keep the values of the unique_pattern seen:
+            memory (default) or disk for exact filtering, bloom[:capacity]
+            for approximate filtering in little memory
+        :type dedupe: str | None
+        :param workers: number of worker processes to render records in
+            parallel (default 1: no parallel processing)
+            Only applies in iteration mode. Parts still reach the sink in the
+            order of the source, except for patterned-output sinks.
+        :type workers: int | str
+        :param incremental: only render the records that are new or changed
+            since the previous run (or have a changed template or variables)
+            Only applies when using a patterned-output sink, keeping track
+            of the records in a manifest file next to the output files.
+        :type incremental: bool | str
+        :param prune: in incremental mode, remove output files of records
+            that are no longer in the source
+        :type prune: bool | str
+        :param writers: number of background threads writing the files
+            of a patterned-output sink (default 0: write while processing)
+        :type writers: int | str
+        :param archive: tar or zip file to pack the files of a
+            patterned-output sink in, rather than writing them individually
+            The sink pattern then determines the names of the entries.
+        :type archive: str | None
+        :param rotate_records: with a sink name holding a {part} pattern,
+            move to a next numbered file after this many records
+        :type rotate_records: int | str
+        :param rotate_bytes: with a sink name holding a {part} pattern,
+            move to a next numbered file after this many bytes
+            Each file starts with the {% block header %} of the template.
+        :type rotate_bytes: int | str
+        :param batch_size: number of records to render in one go
+            (default 0: one by one)
+            Templates can loop over the records in _batch themselves, others
+            are wrapped in such a loop. Only applies in iteration mode and
+            not to patterned-output sinks, nor to rotate_records, nor with
+            parallel workers.
+        :type batch_size: int | str
+        :param targets: other (template_name, sink[, mode]) to render from
+            the same pass over the source, each with its own mode
+            (default: the mode above) and its sink made with the options
+            above (except for the archive, only used for the main sink)
+            Parallel workers do not apply when using several targets.
+        :type targets: list | None
+        :param shard: i/n to only process shard i (from 0) of the records
+            in the source, so n processes together produce the output
+            A single output file is then written as a part for the shard,
+            see ShardFileSink.merge() to combine them.
+        :type shard: str | None
+        :param shard_key: pattern (uritemplate) of which the value decides
+            the shard of each record, by default the unique_pattern
+            if any, else records are dealt out by their index
+        :type shard_key: str | None
+        :param checkpoint: number of records between checkpoints of the
+            progress, allowing to resume an interrupted run
+            (default 0: no checkpoints)
+            Only applies in iteration mode to a single (uncompressed) output
+            file or a patterned-output sink, without parallel workers.
+        :type checkpoint: int | str
+        :param resume: continue from the last checkpoint of an interrupted
+            run, rather than starting over (the output it left is
+            overwritten either way), implies checkpoints
+        :type resume: bool | str
         :return: Subyt object
         :rtype: Subyt
         """
         # upfront checks
-        assert template_name, "template_name is required"
+        assert template_name or targets, "template_name is required"
         assert Path(template_folder).exists(), "template_folder does not exist"
         # default values
         if extra_sources is None:
             extra_sources = {}
+        if targets is None:
+            targets = []
 
         # actual task inputs
         self.template_name = template_name
@@ -102,6 +185,9 @@ class Subyt(ServiceBase):
                     "_": SourceFactory.make_source(
                         source,
                         unique_pattern=unique_pattern,
+                        dedupe=dedupe,
+                        shard=shard,
+                        shard_key=shard_key,
                     )
                 }
             )
@@ -116,6 +202,14 @@ class Subyt(ServiceBase):
         )
         self._conditional = bool(conditional)
         self._variables = variables
+        self._workers = int(workers)
+        self._batch_size = int(batch_size)
+        self._resume = bool(resume)
+        self._checkpoint = int(checkpoint)
+        if self._resume and self._checkpoint <= 0:
+            self._checkpoint = CHECKPOINT_INTERVAL
+        if self._resume:  # the output of the interrupted run is expected
+            overwrite_sink = True
         self._generator_settings = GeneratorSettings(
             mode, break_on_error=break_on_error
         )
@@ -124,9 +218,48 @@ class Subyt(ServiceBase):
         if sink is None:
             sink = "-"
 
-        self._sink = SinkFactory.make_sink(
-            sink, bool(overwrite_sink), bool(allow_repeated_sink_paths)
-        )
+        shard_of_n = parse_shard(shard) if shard is not None else None
+
+        def make_sink(sink: str, archive: str | None = None):
+            return SinkFactory.make_sink(
+                sink,
+                bool(overwrite_sink),
+                bool(allow_repeated_sink_paths),
+                incremental=bool(incremental),
+                prune=bool(prune),
+                writers=int(writers),
+                archive=archive,
+                rotate_records=int(rotate_records),
+                rotate_bytes=int(rotate_bytes),
+                shard=shard_of_n,
+            )
+
+        self._targets = []
+        if template_name:
+            self._targets.append(
+                (
+                    template_name,
+                    make_sink(sink, archive),
+                    self._generator_settings,
+                )
+            )
+        for target in targets:
+            if len(target) not in (2, 3):
+                raise ValueError(
+                    f"target {target} should be (template_name, sink[, mode])"
+                )
+            target_mode = target[2] if len(target) == 3 else mode
+            self._targets.append(
+                (
+                    target[0],
+                    make_sink(target[1]),
+                    GeneratorSettings(
+                        target_mode, break_on_error=break_on_error
+                    ),
+                )
+            )
+        self._sinks = [target_sink for _, target_sink, _ in self._targets]
+        self._sink = self._sinks[0]
         log.debug(f"Subyt initialized with {self.__dict__}")
         if not break_on_error and not allow_repeated_sink_paths:
             log.warning(
@@ -141,14 +274,38 @@ class Subyt(ServiceBase):
 
     @Trace.init(Trace)
     def process(self) -> SubytResult:
-        self._generator.process(
-            template_name=self.template_name,
-            inputs=self._inputs,
-            generator_settings=self._generator_settings,
-            sink=self._sink,
-            vars_dict=self._variables,
-            conditional=self._conditional,
-        )
+        if len(self._targets) > 1:
+            if self._workers > 1:
+                log.warning(
+                    "Parallel processing not supported for several "
+                    "targets. Processing sequentially."
+                )
+            if self._checkpoint > 0:
+                log.warning(
+                    "Checkpoints not supported for several targets. "
+                    "Processing without them."
+                )
+            self._generator.process_targets(
+                self._targets,
+                inputs=self._inputs,
+                vars_dict=self._variables,
+                conditional=self._conditional,
+                batch_size=self._batch_size,
+            )
+        else:
+            template_name, sink, generator_settings = self._targets[0]
+            self._generator.process(
+                template_name=template_name,
+                inputs=self._inputs,
+                generator_settings=generator_settings,
+                sink=sink,
+                vars_dict=self._variables,
+                conditional=self._conditional,
+                workers=self._workers,
+                batch_size=self._batch_size,
+                checkpoint_interval=self._checkpoint,
+                resume=self._resume,
+            )
         self._result._success = True
 
         return self._result
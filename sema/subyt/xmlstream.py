@@ -0,0 +1,162 @@
+import logging
+import re
+from pathlib import Path
+from typing import Iterator, List
+from xml.etree.ElementTree import Element, iterparse
+
+from .compression import open_reader
+
+log = logging.getLogger(__name__)
+
+# steps of a record path: split on '/' except inside {namespace} parts
+PATH_STEP = re.compile(r"(?:\{[^}]*\}|[^/{])+")
+
+
+def _localname(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class RecordPath:
+    """Simple xpath-like selector of record elements, matched against the
+    stack of tags from the root down to an element.
+
+    Supported forms:
+    - ``/root/a/b`` absolute path from the root element
+    - ``//a/b`` elements ``b`` inside ``a``, at any depth
+    - ``a/b`` path relative to the root element (like findall on the root)
+
+    Steps match the full ``{namespace}tag``, the local tag name or ``*``.
+    """
+
+    def __init__(self, path: str, *, steps: List[str] | None = None) -> None:
+        self._path = path
+        self._anywhere = path.startswith("//")
+        self._absolute = not self._anywhere and path.startswith("/")
+        if steps is None:
+            steps = PATH_STEP.findall(path)
+        self._steps = steps
+        assert len(self._steps) > 0, f"invalid record path '{path}'"
+
+    @staticmethod
+    def from_tags(tags: List[str]) -> "RecordPath":
+        """The absolute path to elements with these tags from the root"""
+        return RecordPath("/" + "/".join(tags), steps=list(tags))
+
+    def __repr__(self) -> str:
+        return f"RecordPath('{self._path}')"
+
+    @staticmethod
+    def _step_matches(step: str, tag: str) -> bool:
+        return step == "*" or step == tag or step == _localname(tag)
+
+    def matches(self, tags: List[str]) -> bool:
+        steps = self._steps
+        if self._anywhere:
+            if len(tags) < len(steps):
+                return False
+            tags = tags[len(tags) - len(steps) :]
+        elif self._absolute:
+            if len(tags) != len(steps):
+                return False
+        else:  # relative to the root
+            if len(tags) != len(steps) + 1:
+                return False
+            tags = tags[1:]
+        return all(self._step_matches(s, t) for s, t in zip(steps, tags))
+
+
+def _detach(stack: List[Element], elm: Element) -> None:
+    """Removes the ended elm from its parent, so the tree does not grow"""
+    if stack:
+        stack[-1].remove(elm)
+
+
+def _iterparse(source: str | Path, compression: str | None) -> Iterator:
+    """start and end events of the (possibly compressed) xml file"""
+    with open_reader(source, compression) as content:
+        yield from iterparse(content, events=("start", "end"))
+
+
+def find_unpack_path(
+    source: str | Path, compression: str | None = None
+) -> RecordPath:
+    """Scans the xml (without keeping it in memory) to find the record
+    elements the way xmlasdict ``unpack()`` does: descend into chains of
+    single child elements, the records are the first level with repeated
+    children of one tag, or else the element where that chain stops.
+    """
+    chain: List[Element] = []  # the first-child chain from the root down
+    child_tags: List[set] = []  # distinct child tags per chain element
+    child_count: List[int] = []  # number of children per chain element
+    stack: List[Element] = []
+    for event, elm in _iterparse(source, compression):
+        if event == "start":
+            depth = len(stack)
+            if depth == 0:
+                chain.append(elm)
+                child_tags.append(set())
+                child_count.append(0)
+            elif depth - 1 < len(chain) and stack[-1] is chain[depth - 1]:
+                child_tags[depth - 1].add(elm.tag)
+                child_count[depth - 1] += 1
+                if depth == len(chain) and child_count[depth - 1] == 1:
+                    chain.append(elm)
+                    child_tags.append(set())
+                    child_count.append(0)
+            stack.append(elm)
+            continue
+        # else end event -- drop all content, just keep the tag
+        stack.pop()
+        elm.clear()
+        _detach(stack, elm)
+
+    tags = []
+    for elm, ctags, count in zip(chain, child_tags, child_count):
+        tags.append(elm.tag)
+        if len(ctags) != 1:
+            break  # mixed or no children: this element is the record
+        if count > 1:
+            tags.append(next(iter(ctags)))  # repeated: children are records
+            break
+    return RecordPath.from_tags(tags)
+
+
+def iter_xml_elements(
+    source: str | Path,
+    record_path: RecordPath | None = None,
+    compression: str | None = None,
+) -> Iterator[Element]:
+    """Yields the record elements of an xml file one by one.
+    Every yielded element is detached from the tree, and all content outside
+    the records is dropped as parsing proceeds, keeping memory bounded.
+
+    Without a record_path, the records are found as in xmlasdict ``unpack()``
+    at the cost of an extra pass over the content.
+    The content is decompressed according to the file suffix,
+    or the explicitly passed compression.
+    """
+    if record_path is None:
+        record_path = find_unpack_path(source, compression)
+        log.debug(f"xml records in {source} found at {record_path}")
+    stack: List[Element] = []
+    tags: List[str] = []
+    record_depth: int | None = None
+    for event, elm in _iterparse(source, compression):
+        if event == "start":
+            stack.append(elm)
+            tags.append(elm.tag)
+            if record_depth is None and record_path.matches(tags):
+                record_depth = len(stack)
+            continue
+        # else end event
+        depth = len(stack)
+        stack.pop()
+        tags.pop()
+        if record_depth is not None and depth > record_depth:
+            continue  # content of the record, keep it
+        _detach(stack, elm)
+        if record_depth == depth:
+            record_depth = None
+            yield elm
+        else:
+            elm.clear()
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+from sema.commons.j2 import J2RDFSyntaxBuilder
+from sema.commons.j2.syntax_builder import (
+    BYTECODE_CACHE_ENV,
+    VersionedBytecodeCache,
+)
+
+
+def make_template(folder: Path) -> Path:
+    tpl = folder / "hello.j2"
+    tpl.write_text("hello {{ name }}")
+    return tpl
+
+
+def test_no_cache_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv(BYTECODE_CACHE_ENV, raising=False)
+    make_template(tmp_path)
+    j2sb = J2RDFSyntaxBuilder(str(tmp_path))
+    assert j2sb._templates_env.bytecode_cache is None
+
+
+def test_bytecode_cache_persists(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    tpl = make_template(templates)
+    cache_dir = tmp_path / "cache"
+
+    j2sb = J2RDFSyntaxBuilder(str(templates), bytecode_cache_dir=cache_dir)
+    assert j2sb.build_syntax("hello.j2", name="one") == "hello one"
+    cached = list(cache_dir.iterdir())
+    assert len(cached) == 1, "compiled template should be persisted"
+
+    # a new builder (e.g. next cli run) reuses it
+    j2sb = J2RDFSyntaxBuilder(str(templates), bytecode_cache_dir=cache_dir)
+    assert j2sb.build_syntax("hello.j2", name="two") == "hello two"
+    assert list(cache_dir.iterdir()) == cached
+
+    # changing the template replaces the cache entry, leaving no stale one
+    tpl.write_text("bye {{ name }}")
+    os.utime(tpl, ns=(0, tpl.stat().st_mtime_ns + 10**9))
+    j2sb = J2RDFSyntaxBuilder(str(templates), bytecode_cache_dir=cache_dir)
+    assert j2sb.build_syntax("hello.j2", name="three") == "bye three"
+    assert list(cache_dir.iterdir()) == cached
+    j2sb = J2RDFSyntaxBuilder(str(templates), bytecode_cache_dir=cache_dir)
+    assert j2sb.build_syntax("hello.j2", name="four") == "bye four"
+
+
+def test_bytecode_cache_from_env(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "envcache"
+    monkeypatch.setenv(BYTECODE_CACHE_ENV, str(cache_dir))
+    make_template(tmp_path)
+    j2sb = J2RDFSyntaxBuilder(str(tmp_path))
+    assert isinstance(
+        j2sb._templates_env.bytecode_cache, VersionedBytecodeCache
+    )
+    assert j2sb.build_syntax("hello.j2", name="env") == "hello env"
+    assert cache_dir.exists() and len(list(cache_dir.iterdir())) == 1
@@ -0,0 +1,55 @@
+import logging
+from timeit import timeit
+
+import pytest
+
+from sema.commons.j2.j2_functions import (
+    Filters,
+    compiled_xsd_formatter,
+    xsd_format,
+)
+
+log = logging.getLogger(__name__)
+
+# number of calls timed per case
+CALLS: int = 20_000
+
+BENCH_CASES = [
+    ("xsd", ("plain text value", "xsd:string")),
+    ("xsd", ("it's \\ quoted", "xsd:string", '"')),
+    ("xsd", ("tekst", "@nl")),
+    ("xsd", ("42", "xsd:integer")),
+    ("xsd", ("3.14", "double")),
+    ("xsd", ("2024-01-13", "xsd:date")),
+    ("xsd", ("2024-01-13T11:48:29", "auto")),
+    ("xsd", ("plain text value", "auto")),
+    ("xsd", ("https://example.org/x", "auto")),
+    ("uri", ("https://example.org/x",)),
+    ("uri", ("https://example.org/with space/[x]",)),
+]
+
+
+def test_compiled_formatter_reused():
+    assert compiled_xsd_formatter("XSD:String", "'") is (
+        compiled_xsd_formatter("XSD:String", "'")
+    )
+    assert xsd_format("it's \\", "xsd:string") == "'it\\'s \\\\'^^xsd:string"
+    assert xsd_format("a\nb", "@en", '"') == '"""a\nb"""@en'
+    with pytest.raises(AssertionError):
+        xsd_format("x", "xsd:string", "`")
+    with pytest.raises(AssertionError):
+        xsd_format("x", "xsd:unknown")
+
+
+@pytest.mark.usefixtures("quicktest")
+def test_bench_filters(quicktest: bool):
+    """micro-benchmark of the xsd and uri filters, reports the time per
+    call in the log (run with --log-cli-level=INFO to see it)
+    timings are not asserted, as they depend on the machine and its load"""
+    if quicktest:
+        pytest.skip("skipping micro-benchmark in quicktest mode")
+    filters = Filters.all()
+    for name, args in BENCH_CASES:
+        fn = filters[name]
+        per_call = timeit(lambda: fn(*args), number=CALLS) / CALLS
+        log.info(f"{name}{args}: {per_call * 1e6:.2f} us/call")
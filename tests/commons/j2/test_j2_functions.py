@@ -3,7 +3,13 @@ from typing import Callable
 
 import pytest
 
-from sema.commons.j2.j2_functions import Filters, Functions, ValueMapper
+from sema.commons.j2 import J2RDFSyntaxBuilder
+from sema.commons.j2.j2_functions import (
+    Filters,
+    Functions,
+    LRUCache,
+    ValueMapper,
+)
 
 uritexpand_fmt = Functions.all()["uritexpand"]
 regexreplace_fmt = Functions.all()["regexreplace"]
@@ -368,6 +374,9 @@ def test_fail_auto_number() -> None:
         (("2024-01", "'2024-01'^^xsd:gYearMonth", "'")),
         # (("2024", "'2024'^^xsd:gYear", "'")), -- int inference is stronger
         (("brol", "'brol'^^xsd:string", "'")),
+        (("urn:isbn:0451450523", "'urn:isbn:0451450523'^^xsd:anyURI", "'")),
+        (("note: no uri", "'note: no uri'^^xsd:string", "'")),
+        (("2024-13", "'2024-13'^^xsd:string", "'")),
     ],
 )
 def test_auto_any(case: tuple[str, str, str | None]) -> None:
@@ -439,3 +448,33 @@ def test_mapbuild() -> None:
         assert record["to-field"] == map_expects[origin], (
             "map not applied correctly",
         )
+
+
+def test_lru_cache() -> None:
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # makes "b" the least recently used
+    cache["c"] = 3
+    assert "b" not in cache, "least recently used entry should be evicted"
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_mapbuild_cache_per_builder(tmp_path) -> None:
+    (tmp_path / "map.j2").write_text(
+        "{{ map(items, 'k', 'v', 'themap')._map['a'] }}"
+    )
+    one = J2RDFSyntaxBuilder(str(tmp_path))
+    other = J2RDFSyntaxBuilder(str(tmp_path))
+    assert one.build_syntax("map.j2", items=[{"k": "a", "v": 1}]) == "1"
+    # the cached map is reused within the builder
+    assert one.build_syntax("map.j2", items=[{"k": "a", "v": 2}]) == "1"
+    # but not shared with other builders
+    assert other.build_syntax("map.j2", items=[{"k": "a", "v": 3}]) == "3"
+    # and dropped on reset
+    one.reset_cache()
+    assert one.build_syntax("map.j2", items=[{"k": "a", "v": 4}]) == "4"
+    assert "themap" not in Functions._cache
@@ -45,3 +45,24 @@ def test_get_variables_sparql_template(name):
     assert (
         variables == template_variables[name]
     ), f"unexpected variables in {name}"
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        (
+            "{{ _.a }} {{ _['b'] | upper }} {% if _.c %}x{% endif %}",
+            {"a", "b", "c"},
+        ),
+        ("{% for x in other %}{{ x.a }}{% endfor %}", set()),
+        ("{{ _[key] }}", None),
+        ("{{ _.keys() | list }}", None),
+        ("{{ uritexpand('{#id}', _) }}", None),
+        ("{% include 'other.j2' %}{{ _.a }}", None),
+    ],
+)
+def test_fields_in_template(tmp_path, source, expected):
+    (tmp_path / "tpl.j2").write_text(source)
+    (tmp_path / "other.j2").write_text("{{ _.z }}")
+    j2sb = J2RDFSyntaxBuilder(str(tmp_path))
+    assert j2sb.fields_in_template("tpl.j2") == expected
@@ -71,6 +71,13 @@ def test_query_functions():
     assert type(result.to_dataframe()) == pd.DataFrame
 
 
+def test_query_rows():
+    source = GraphSource.build(*TTL_FILES_TO_TEST)
+    rows = list(source.rows(ALL_TRIPLES_SPARQL))
+    assert rows == source.query(ALL_TRIPLES_SPARQL).to_list()
+    assert all(set(row) == {"s", "p", "o"} for row in rows)
+
+
 class DummyGraphSource(GraphSource):
     pass  # pragma: no cover
 
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+
+from sema.subyt import JinjaBasedGenerator
+from sema.subyt.api import Generator, GeneratorSettings
+from sema.subyt.sinks import PatternedFileSink, SingleFileSink
+from sema.subyt.subyt import Subyt
+
+RECORD_TEMPLATE = (
+    "{% if ctrl.isFirst %}first;{% endif %}"
+    "{{ ctrl.index }}:{{ _.id }}<{{ _.name }}>"
+    "{% if ctrl.isLast %};last{% endif %};\n"
+)
+
+
+def run(tmp_path: Path, template: str, rows: int, **kwargs) -> str:
+    (tmp_path / "templates").mkdir(exist_ok=True)
+    (tmp_path / "templates" / "tpl.txt").write_text(template)
+    data = tmp_path / "data.csv"
+    data.write_text("id,name\n" + "".join(f"{n},n&{n}\n" for n in range(rows)))
+    out = tmp_path / "out.txt"
+    Subyt(
+        template_name="tpl.txt",
+        template_folder=str(tmp_path / "templates"),
+        source=str(data),
+        sink=str(out),
+        break_on_error=True,
+        **kwargs,
+    ).process()
+    return out.read_text()
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+@pytest.mark.parametrize(
+    "template",
+    [
+        RECORD_TEMPLATE,
+        # with blocks, the template is rendered record by record
+        "{% block header %}h;{% endblock %}" + RECORD_TEMPLATE,
+        # autoescaping applies as in the template itself
+        "{% autoescape true %}" + RECORD_TEMPLATE + "{% endautoescape %}",
+    ],
+)
+def test_per_record_template_in_batch(
+    tmp_path: Path, template: str, batch_size: int
+):
+    expected = run(tmp_path, template, 7)
+    assert "first;0:0" in expected and ";last;" in expected
+    assert ("&amp;" in expected) == ("autoescape" in template)
+    assert run(tmp_path, template, 7, batch_size=batch_size) == expected
+
+
+def test_batch_template(tmp_path: Path):
+    template = "[{% for _ in _batch %}{{ _.id }}{% endfor %}:{{ ctrl.index }}]"
+    assert run(tmp_path, template, 5, batch_size=2) == "[01:0][23:2][4:4]"
+
+
+def test_batch_of_nothing(tmp_path: Path):
+    expected = run(tmp_path, RECORD_TEMPLATE, 0)
+    assert expected == "first;0:<>;last;"
+    assert run(tmp_path, RECORD_TEMPLATE, 0, batch_size=5) == expected
+    template = "[{% for _ in _batch %}{{ _.id }}{% endfor %}]"
+    assert run(tmp_path, template, 0, batch_size=5) == "[]"
+
+
+def test_batch_processor_selection(tmp_path: Path):
+    generator = JinjaBasedGenerator(str(tmp_path))
+    settings = GeneratorSettings()
+    sink = SingleFileSink(str(tmp_path / "out.txt"))
+    (tmp_path / "tpl.txt").write_text(RECORD_TEMPLATE)
+    proc = generator.make_processor("tpl.txt", {}, settings, sink)
+    assert type(proc) is Generator.Processor
+    proc = generator.make_processor(
+        "tpl.txt", {}, settings, sink, batch_size=10
+    )
+    assert isinstance(proc, Generator.BatchProcessor)
+    assert PatternedFileSink.per_record and not sink.per_record
@@ -0,0 +1,183 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from sema.subyt import JinjaBasedGenerator
+from sema.subyt.api import GeneratorSettings
+from sema.subyt.checkpoint import Checkpoint
+from sema.subyt.sinks import PatternedFileSink, SingleFileSink
+from sema.subyt.sources import SourceFactory
+from sema.subyt.subyt import Subyt
+
+TEMPLATE = (
+    "{% if ctrl.isFirst %}{% block header %}@prefix ex: <urn:x:> .\n"
+    "{% endblock %}{% endif %}"
+    "ex:{{ _.id }} ex:index {{ ctrl.index }} .\n"
+    "{% if ctrl.isLast %}# end{% endif %}"
+)
+TAGGED = "{{ _.id }}:{{ tag }};"
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingFileSink(SingleFileSink):
+    """Sink failing when adding the record with the crash_id"""
+
+    def __init__(self, path_name: str, crash_id: str | None):
+        super().__init__(path_name, True)
+        self._crash_id = crash_id
+
+    def add(self, part, item=None, source_mtime=None):
+        if item is not None and item["id"] == self._crash_id:
+            raise Crash(f"crashing at {item}")
+        super().add(part, item, source_mtime)
+
+
+def run(
+    tmp_path: Path,
+    sink,
+    resume: bool = False,
+    template: str = TEMPLATE,
+    template_name: str = "tpl.ttl",
+    **kwargs,
+) -> None:
+    (tmp_path / template_name).write_text(template)
+    JinjaBasedGenerator(str(tmp_path)).process(
+        template_name,
+        {"_": SourceFactory.make_source(tmp_path / "data.csv")},
+        GeneratorSettings(break_on_error=True),
+        sink,
+        checkpoint_interval=3,
+        resume=resume,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def data(tmp_path: Path) -> Path:
+    data = tmp_path / "data.csv"
+    data.write_text("id\n" + "".join(f"{n}\n" for n in range(10)))
+    return data
+
+
+def test_resume_single_file(tmp_path: Path, data: Path):
+    expected = tmp_path / "expected.ttl"
+    run(tmp_path, SingleFileSink(str(expected)))
+    assert not Path(f"{expected}.checkpoint.json").exists()
+
+    out = tmp_path / "out.ttl"
+    with pytest.raises(Crash):
+        run(tmp_path, CrashingFileSink(str(out), "7"))
+    checkpoint = Path(f"{out}.checkpoint.json")
+    assert checkpoint.exists()
+    assert out.read_text() != expected.read_text()
+    run(tmp_path, CrashingFileSink(str(out), None), resume=True)
+    assert out.read_text() == expected.read_text()
+    assert not checkpoint.exists(), "removed when done"
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        dict(vars_dict=dict(tag="B")),
+        dict(template="{{ _.id }}={{ tag }};", vars_dict=dict(tag="A")),
+        dict(template_name="other.ttl", vars_dict=dict(tag="A")),
+    ],
+)
+def test_resume_other_job(tmp_path: Path, data: Path, other: dict):
+    other = dict(dict(template=TAGGED), **other)
+    expected = tmp_path / "expected.ttl"
+    run(tmp_path, SingleFileSink(str(expected)), **other)
+    out = tmp_path / "out.ttl"
+    with pytest.raises(Crash):
+        run(
+            tmp_path,
+            CrashingFileSink(str(out), "5"),
+            template=TAGGED,
+            vars_dict=dict(tag="A"),
+        )
+    # another template or variables make another job: starting over
+    run(tmp_path, CrashingFileSink(str(out), None), resume=True, **other)
+    assert out.read_text() == expected.read_text()
+
+
+def test_checkpoint_file(tmp_path: Path):
+    checkpoint = Checkpoint(tmp_path / "cp.json", "job", 5)
+    assert checkpoint.load() is None
+    checkpoint.save(10, dict(offset=42))
+    assert checkpoint.load() == dict(job="job", index=10, sink={"offset": 42})
+    assert Checkpoint(tmp_path / "cp.json", "other").load() is None
+    checkpoint.remove()
+    assert checkpoint.load() is None
+
+
+class CrashingPatternedSink(PatternedFileSink):
+    def __init__(
+        self, name_pattern: str, crash_id: str | None, repeats: bool = False
+    ):
+        super().__init__(name_pattern, False, repeats, writers=2)
+        self._crash_id = crash_id
+
+    def add(self, part, item=None, source_mtime=None):
+        if item["id"] == self._crash_id:
+            raise Crash(f"crashing at {item}")
+        super().add(part, item, source_mtime)
+
+
+def test_resume_patterned(tmp_path: Path, data: Path):
+    pattern = str(tmp_path / "out" / "{id}.ttl")
+    with pytest.raises(Crash):
+        run(tmp_path, CrashingPatternedSink(pattern, "7"))
+    checkpoint = tmp_path / "out" / PatternedFileSink.CHECKPOINT_NAME
+    assert checkpoint.exists()
+    # the paths are logged, not kept in the checkpoint itself
+    paths_log = tmp_path / "out" / PatternedFileSink.PATHS_LOG_NAME
+    size = json.loads(checkpoint.read_text())["sink"]["paths_size"]
+    logged = paths_log.read_bytes()[:size].decode("utf-8").splitlines()
+    assert [Path(json.loads(p)).stem for p in logged] == list("012345")
+    (tmp_path / "out" / "1.ttl").unlink()  # not to be rendered again
+    assert (tmp_path / "out" / "6.ttl").exists()  # to be rendered again
+    run(tmp_path, CrashingPatternedSink(pattern, None), resume=True)
+    assert not checkpoint.exists()
+    assert not paths_log.exists()
+    found = sorted(p.stem for p in (tmp_path / "out").glob("*.ttl"))
+    assert found == [str(n) for n in range(10) if n != 1]
+    last = (tmp_path / "out" / "9.ttl").read_text()
+    assert last == "ex:9 ex:index 9 .\n# end"
+
+
+@pytest.mark.parametrize("repeats", [False, True])
+def test_resume_repeated_paths(tmp_path: Path, repeats: bool):
+    data = tmp_path / "data.csv"
+    data.write_text("id\n" + "".join(f"{n}\n" for n in [*range(10), 1]))
+    pattern = str(tmp_path / "out" / "{id}.ttl")
+    with pytest.raises(Crash):
+        run(tmp_path, CrashingPatternedSink(pattern, "7", repeats))
+    resumed = CrashingPatternedSink(pattern, None, repeats)
+    if not repeats:  # the repeat of a path from before the checkpoint
+        with pytest.raises(RuntimeError):
+            run(tmp_path, resumed, resume=True)
+        return
+    run(tmp_path, resumed, resume=True)
+    first = (tmp_path / "out" / "1.ttl").read_text()
+    assert first.startswith("ex:1 ex:index 1 .")
+    repeat = (tmp_path / "out" / "1.ttl_0").read_text()
+    assert repeat.startswith("ex:1 ex:index 10 .")
+
+
+def test_subyt_resume(tmp_path: Path, data: Path):
+    (tmp_path / "tpl.ttl").write_text(TEMPLATE)
+    out = tmp_path / "out.ttl"
+    out.write_text("left by an interrupted run")
+    Subyt(
+        template_name="tpl.ttl",
+        template_folder=str(tmp_path),
+        source=str(data),
+        sink=str(out),
+        overwrite_sink=False,
+        resume=True,
+    ).process()
+    assert out.read_text().count("ex:index") == 10
@@ -0,0 +1,58 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.sources import (
+    PREFETCH_QUEUE_SIZE,
+    FolderSource,
+    GlobSource,
+    SourceFactory,
+)
+
+DATA_FOLDER = Path(__file__).absolute().parent / "in"
+
+
+def read_all(source) -> list:
+    with source as records:
+        return [dict(r) if isinstance(r, dict) else r for r in records]
+
+
+@pytest.mark.parametrize("prefetch", [1, 3, 10])
+def test_prefetch_keeps_order(prefetch: int):
+    expected = read_all(SourceFactory.make_source(DATA_FOLDER / "data_cities"))
+    folder = SourceFactory.make_source(
+        f"{DATA_FOLDER / 'data_cities'}+prefetch={prefetch}"
+    )
+    assert isinstance(folder, FolderSource) and folder._prefetch == prefetch
+    assert [str(r) for r in read_all(folder)] == [str(r) for r in expected]
+
+
+def test_prefetch_many_files(tmp_path: Path):
+    for n in range(40):
+        records = [{"file": n, "row": i} for i in range(50)]
+        (tmp_path / f"f{n:02d}.json").write_text(json.dumps(records))
+    glob = GlobSource("*.json", str(tmp_path), prefetch=4)
+    found = [(r["file"], r["row"]) for r in read_all(glob)]
+    assert found == [(n, i) for n in range(40) for i in range(50)]
+
+
+def test_prefetch_stops_early(tmp_path: Path):
+    rows = PREFETCH_QUEUE_SIZE * 3  # more than fits in the queues
+    for n in range(3):
+        records = [{"file": n, "row": i} for i in range(rows)]
+        (tmp_path / f"f{n}.json").write_text(json.dumps(records))
+    folder = FolderSource(tmp_path, prefetch=2)
+    with folder as records:
+        assert next(iter(records))["row"] == 0
+    alive = [t for t in threading.enumerate() if "prefetch" in t.name]
+    assert alive == [], "reading ahead should stop on exit"
+
+
+def test_prefetch_errors(tmp_path: Path):
+    (tmp_path / "a.json").write_text(json.dumps([{"ok": 1}]))
+    (tmp_path / "b.json").write_text("{ not json")
+    folder = FolderSource(tmp_path, prefetch=2)
+    with pytest.raises(Exception):
+        read_all(folder)
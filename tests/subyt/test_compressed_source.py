@@ -0,0 +1,81 @@
+import bz2
+import gzip
+import json
+import lzma
+import shutil
+from pathlib import Path
+
+import pytest
+
+from sema.subyt import jsonstream
+from sema.subyt.sources import SourceFactory
+
+DATA_FOLDER = Path(__file__).absolute().parent / "in"
+COMPRESSORS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def compress(source: Path, target: Path, suffix: str) -> Path:
+    with open(source, "rb") as fin, COMPRESSORS[suffix](target, "wb") as fout:
+        shutil.copyfileobj(fin, fout)
+    return target
+
+
+def read_all(identifier) -> list:
+    with SourceFactory.make_source(identifier) as records:
+        return [str(r) for r in records]
+
+
+@pytest.mark.parametrize("suffix", list(COMPRESSORS))
+@pytest.mark.parametrize(
+    "name", ["data.csv", "data_team.json", "data_movies.xml"]
+)
+def test_compressed_matches_plain(tmp_path: Path, name: str, suffix: str):
+    plain = DATA_FOLDER / name
+    packed = compress(plain, tmp_path / f"{name}{suffix}", suffix)
+    expected = read_all(plain)
+    assert len(expected) > 0
+    assert read_all(packed) == expected
+    assert read_all(str(packed)) == expected
+
+
+@pytest.mark.parametrize(
+    "name", ["data.csv", "data_team.json", "data_movies.xml"]
+)
+def test_zstd_matches_plain(tmp_path: Path, name: str):
+    zstandard = pytest.importorskip("zstandard")
+    plain = DATA_FOLDER / name
+    packed = tmp_path / f"{name}.zst"
+    packed.write_bytes(zstandard.ZstdCompressor().compress(plain.read_bytes()))
+    assert read_all(packed) == read_all(plain)
+
+
+def test_zstd_wrapped_json(tmp_path: Path, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+    monkeypatch.setattr(jsonstream, "READ_SIZE", 4)  # to go back unbuffered
+    content = json.dumps({"root": {"items": [{"id": n} for n in range(9)]}})
+    packed = tmp_path / "data.json.zst"
+    packed.write_bytes(zstandard.ZstdCompressor().compress(content.encode()))
+    assert read_all(packed) == [str({"id": n}) for n in range(9)]
+
+
+def test_mime_from_inner_extension():
+    assert SourceFactory.mime_from_identifier("x.csv.gz") == "text/csv"
+    jsonl_mime = SourceFactory.mime_from_identifier("x.jsonl.zst")
+    assert jsonl_mime == "application/jsonl"
+    assert SourceFactory.mime_from_identifier("x.json") == "application/json"
+
+
+def test_explicit_compression(tmp_path: Path):
+    packed = compress(DATA_FOLDER / "data.csv", tmp_path / "data.csv", ".gz")
+    expected = read_all(DATA_FOLDER / "data.csv")
+    assert read_all(f"{packed}+compression=gz") == expected
+    with pytest.raises(ValueError):
+        read_all(f"{packed}+compression=rar")
+
+
+def test_compressed_jsonlines(tmp_path: Path):
+    packed = tmp_path / "data.ndjson.gz"
+    with gzip.open(packed, "wt", encoding="utf-8") as f:
+        f.write('{"id": 1}\n\n{"id": 2}\n')
+    with SourceFactory.make_source(str(packed)) as records:
+        assert list(records) == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,150 @@
+from pathlib import Path
+
+import pytest
+
+from sema.subyt import JinjaBasedGenerator
+from sema.subyt.__main__ import _main
+from sema.subyt.api import GeneratorSettings, Sink, Source
+from sema.subyt.subyt import Subyt
+
+TEMPLATES = {
+    "ids.txt": (
+        "{% if ctrl.isFirst %}[{% endif %}{{ _.id }}"
+        "{% if ctrl.isLast %}]{% else %},{% endif %}"
+    ),
+    "names.txt": "{{ ctrl.index }}={{ _.name }};",
+    "count.txt": "{{ sets['_'] | length }} records",
+    "sized.txt": "{{ _.id }}/{{ sets._ | list | length }};",
+}
+
+
+class CountingSource(Source):
+    """Source of a few records, counting how often it is read"""
+
+    def __init__(self, rows: int) -> None:
+        super().__init__()
+        self._rows = rows
+        self.reads = 0
+
+    def __enter__(self):
+        self.reads += 1
+        return iter([{"id": n, "name": f"n{n}"} for n in range(self._rows)])
+
+    def __exit__(self, *exc):
+        pass
+
+
+class ListSink(Sink):
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts = []
+
+    def open(self):
+        pass
+
+    def add(self, part: str, item=None, source_mtime=None):
+        self.parts.append(part)
+
+    def close(self):
+        pass
+
+
+def make_templates(tmp_path: Path) -> Path:
+    folder = tmp_path / "templates"
+    folder.mkdir()
+    for name, content in TEMPLATES.items():
+        (folder / name).write_text(content)
+    return folder
+
+
+def test_process_targets_reads_once(tmp_path: Path):
+    generator = JinjaBasedGenerator(str(make_templates(tmp_path)))
+    source = CountingSource(3)
+    sinks = [ListSink() for _ in range(2)]
+    targets = [
+        ("ids.txt", sinks[0], GeneratorSettings()),
+        ("names.txt", sinks[1], GeneratorSettings()),
+    ]
+    generator.process_targets(targets, {"_": source})
+    assert source.reads == 1
+    assert "".join(sinks[0].parts) == "[0,1,2]"
+    assert "".join(sinks[1].parts) == "0=n0;1=n1;2=n2;"
+
+
+def test_process_targets_with_collection(tmp_path: Path):
+    generator = JinjaBasedGenerator(str(make_templates(tmp_path)))
+    source = CountingSource(4)
+    sinks = [ListSink() for _ in range(2)]
+    targets = [
+        ("ids.txt", sinks[0], GeneratorSettings("it")),
+        ("count.txt", sinks[1], GeneratorSettings("no-it")),
+    ]
+    generator.process_targets(targets, {"_": source})
+    assert source.reads == 1
+    assert "".join(sinks[0].parts) == "[0,1,2,3]"
+    assert sinks[1].parts == ["4 records"]
+
+
+def test_iterating_reads_base_set(tmp_path: Path):
+    # the base set remains available as a whole while iterating it
+    generator = JinjaBasedGenerator(str(make_templates(tmp_path)))
+    sink = ListSink()
+    generator.process(
+        "sized.txt", {"_": CountingSource(3)}, GeneratorSettings(), sink
+    )
+    assert "".join(sink.parts) == "0/3;1/3;2/3;"
+    source = CountingSource(2)
+    sinks = [ListSink() for _ in range(2)]
+    targets = [
+        ("ids.txt", sinks[0], GeneratorSettings()),
+        ("sized.txt", sinks[1], GeneratorSettings()),
+    ]
+    generator.process_targets(targets, {"_": source})
+    assert source.reads == 1
+    assert "".join(sinks[0].parts) == "[0,1]"
+    assert "".join(sinks[1].parts) == "0/2;1/2;"
+
+
+def test_subyt_targets(tmp_path: Path):
+    folder = make_templates(tmp_path)
+    data = tmp_path / "data.csv"
+    data.write_text("id,name\n1,a\n2,b\n")
+    out = {name: tmp_path / f"out-{name}" for name in TEMPLATES}
+    Subyt(
+        template_name="ids.txt",
+        template_folder=str(folder),
+        source=str(data),
+        sink=str(out["ids.txt"]),
+        targets=[
+            ("names.txt", str(out["names.txt"])),
+            ("count.txt", str(out["count.txt"]), "no-it"),
+        ],
+        break_on_error=True,
+    ).process()
+    assert out["ids.txt"].read_text() == "[1,2]"
+    assert out["names.txt"].read_text() == "0=a;1=b;"
+    assert out["count.txt"].read_text() == "2 records"
+
+
+def test_cli_targets(tmp_path: Path):
+    folder = make_templates(tmp_path)
+    data = tmp_path / "data.csv"
+    data.write_text("id,name\n1,a\n2,b\n")
+    ids, count = tmp_path / "ids.out", tmp_path / "count.out"
+    cli_line = (
+        f"--templates {folder} --input {data}"
+        f" --target ids.txt {ids} --target count.txt {count} no-it"
+    )
+    assert _main(*cli_line.split())
+    assert ids.read_text() == "[1,2]"
+    assert count.read_text() == "2 records"
+    bad_line = f"--templates {folder} --input {data} --target ids.txt"
+    assert not _main(*bad_line.split())
+
+
+def test_subyt_bad_target(tmp_path: Path):
+    with pytest.raises(ValueError):
+        Subyt(
+            template_folder=str(make_templates(tmp_path)),
+            targets=[("ids.txt",)],
+        )
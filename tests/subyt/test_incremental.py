@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.sinks import PatternedFileSink
+from sema.subyt.subyt import Subyt
+
+HEADER = "id,name\n"
+KEPT = 1000  # mtime_ns marker set on all files after each run
+
+
+def run(
+    tmp_path: Path,
+    template: str,
+    workers: int = 1,
+    force: bool = True,
+    **vars,
+) -> dict:
+    """runs subyt incrementally, returns the mtime_ns of all output files
+    (those not rewritten by this run will have the KEPT marker)"""
+    (tmp_path / "templates").mkdir(exist_ok=True)
+    (tmp_path / "templates" / "tpl.ttl").write_text(template)
+    Subyt(
+        template_name="tpl.ttl",
+        template_folder=str(tmp_path / "templates"),
+        source=str(tmp_path / "data.csv"),
+        sink=str(tmp_path / "out" / "item-{id}.ttl"),
+        incremental=True,
+        prune=True,
+        variables=vars,
+        workers=workers,
+        overwrite_sink=force,
+        break_on_error=True,
+    ).process()
+    mtimes = dict()
+    for p in (tmp_path / "out").iterdir():
+        if p.name != PatternedFileSink.MANIFEST_NAME:
+            mtimes[p.name] = p.stat().st_mtime_ns
+            os.utime(p, ns=(KEPT, KEPT))
+    return mtimes
+
+
+@pytest.mark.parametrize(
+    "workers, force", [(1, True), (2, True), (1, False), (2, False)]
+)
+def test_incremental_output(tmp_path: Path, workers: int, force: bool):
+    # without force, the files in the manifest are still overwritten
+    template = "{{ _.id }} {{ _.name }}"
+    data = tmp_path / "data.csv"
+    data.write_text(HEADER + "1,one\n2,two\n3,three\n")
+    first = run(tmp_path, template, workers, force)
+    assert sorted(first) == ["item-1.ttl", "item-2.ttl", "item-3.ttl"]
+    assert (tmp_path / "out" / PatternedFileSink.MANIFEST_NAME).exists()
+
+    # unchanged input: nothing gets rewritten
+    assert set(run(tmp_path, template, workers, force).values()) == {KEPT}
+
+    # one changed, one removed record: only that one is rewritten
+    data.write_text(HEADER + "1,one\n2,TWO\n")
+    second = run(tmp_path, template, workers, force)
+    assert sorted(second) == ["item-1.ttl", "item-2.ttl"], "3 to be pruned"
+    assert second["item-1.ttl"] == KEPT
+    assert second["item-2.ttl"] != KEPT
+    assert (tmp_path / "out" / "item-2.ttl").read_text() == "2 TWO"
+
+    # changed template or variables: all rewritten
+    third = run(tmp_path, template + "{{ extra }}", workers, force)
+    assert KEPT not in third.values()
+    fourth = run(tmp_path, template + "{{ extra }}", workers, force, extra="!")
+    assert KEPT not in fourth.values()
+    assert (tmp_path / "out" / "item-1.ttl").read_text() == "1 one!"
+
+
+def test_manifest_folder():
+    assert PatternedFileSink.manifest_folder("out/{id}.ttl") == Path("out")
+    assert PatternedFileSink.manifest_folder("out/x-{id}.ttl") == Path("out")
+    assert PatternedFileSink.manifest_folder("{id}.ttl") == Path(".")
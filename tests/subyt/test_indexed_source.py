@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from sema.subyt.sets import IndexedSet
+from sema.subyt.sources import IndexedSource, SourceFactory
+from sema.subyt.subyt import Subyt
+
+MY_FOLDER = Path(__file__).parent
+DATA_FOLDER = MY_FOLDER / "in"
+TEMPLATES_FOLDER = MY_FOLDER / "templates"
+COUNTRIES = DATA_FOLDER / "data_countries.csv"
+
+
+def test_index_lookups():
+    source = SourceFactory.make_source(f"{COUNTRIES}+index=Alpha-3 code")
+    assert isinstance(source, IndexedSource)
+    with source as countries:
+        assert isinstance(countries, IndexedSet)
+        assert countries.get("BEL")["Alpha-2 code"] == "BE"
+        assert countries.get("XYZ") is None
+        assert countries.get("XYZ", {}) == {}
+        assert [c["Alpha-2 code"] for c in countries.getall("BEL")] == ["BE"]
+        assert countries.getall("XYZ") == []
+        # still a regular set as well
+        assert len(list(countries)) == len(countries) > 200
+
+
+def test_index_multiple_values(tmp_path):
+    data = tmp_path / "data.csv"
+    data.write_text("code,val\na,1\nb,2\na,3\n")
+    source = SourceFactory.make_source({"path": data, "index": "code"})
+    with source as records:
+        assert [r["val"] for r in records.getall("a")] == ["1", "3"]
+        assert records.get("a")["val"] == "1"
+
+
+def test_index_on_fake_empty_source():
+    source = SourceFactory.make_source(
+        "missing.csv+index=code", fake_empty=True
+    )
+    with source as records:
+        assert records.get("anything") is None
+
+
+def test_join_in_template(tmp_path):
+    outfile = tmp_path / "out.ttl"
+    Subyt(
+        template_name="extra/country-join.ttl",
+        template_folder=str(TEMPLATES_FOLDER),
+        source=str(DATA_FOLDER / "data.csv"),
+        extra_sources={"countries": f"{COUNTRIES}+index=Alpha-3 code"},
+        sink=str(outfile),
+    ).process()
+    content = outfile.read_text()
+    assert "'Belgium'" in content
+    assert "'United States'" in content
@@ -0,0 +1,111 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from sema.subyt import jsonstream
+from sema.subyt.jsonstream import iter_json_records
+from sema.subyt.sources import (
+    JsonFileSource,
+    JsonLinesFileSource,
+    SourceFactory,
+)
+
+MY_FOLDER = Path(__file__).parent
+DATA_FOLDER = MY_FOLDER / "in"
+
+
+def load_unwrapped(content: str) -> list:
+    """the reference behaviour: load all, then unwrap single-key objects"""
+    data = json.loads(content)
+    while isinstance(data, dict) and len(data.keys()) == 1:
+        child = list(data.values())[0]
+        if isinstance(child, dict) and len(child.keys()) == 0:
+            data = [data]
+        else:
+            data = child
+    if not isinstance(data, list):
+        data = [data]
+    return data
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '[{"a": 1}, {"a": 2.5e3, "b": [1, {"c": "x,]}\\""}]}]',
+        '{"root": {"items": [1, true, null, "two"]}}',
+        '{"root": {"items": [1, 2]}, "other": 3}',
+        '{"root": {}}',
+        "{}",
+        "[]",
+        '"just a string"',
+        "12345",
+        '\ufeff  {"wrapped": [{"naïve": "unicode ✓"}]}  ',
+        '{"single": {"a": 1, "b": 2}}',
+    ],
+)
+@pytest.mark.parametrize("read_size", [1, 3, 1 << 16])
+def test_streaming_matches_full_load(monkeypatch, content, read_size):
+    monkeypatch.setattr(jsonstream, "READ_SIZE", read_size)
+    stream = io.BytesIO(content.encode("utf-8"))
+    expected = load_unwrapped(content.lstrip("\ufeff"))
+    assert list(iter_json_records(stream)) == expected
+
+
+class UnseekableBytes(io.RawIOBase):
+    """In-memory content that can only be read forward (like zstd)"""
+
+    def __init__(self, content: bytes):
+        self._content = io.BytesIO(content)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        return self._content.readinto(b)
+
+
+@pytest.mark.parametrize("read_size", [1, 3, 1 << 16])
+def test_streaming_unseekable(monkeypatch, read_size):
+    monkeypatch.setattr(jsonstream, "READ_SIZE", read_size)
+    content = '\ufeff{"root": {"items": [1, {"a": 2}]}}'.encode("utf-8")
+    opened = list()
+
+    def reopen():
+        opened.append(io.BufferedReader(UnseekableBytes(content)))
+        return opened[-1]
+
+    stream = reopen()
+    assert not stream.seekable()
+    assert list(iter_json_records(stream, reopen)) == [1, {"a": 2}]
+    assert all(s.closed for s in opened[1:]), "reopened streams are closed"
+    if read_size < len(content):  # going back beyond what is buffered
+        with pytest.raises(ValueError):
+            list(iter_json_records(reopen()))
+    array = io.BufferedReader(UnseekableBytes(b"[1, 2]"))
+    assert list(iter_json_records(array)) == [1, 2]
+
+
+@pytest.mark.parametrize("name", ["data_digits.json", "data_team.json"])
+def test_json_file_source(name):
+    path = DATA_FOLDER / name
+    source = SourceFactory.make_source(str(path))
+    assert isinstance(source, JsonFileSource)
+    with source as records:
+        found = list(records)
+    assert found == load_unwrapped(path.read_text(encoding="utf-8-sig"))
+
+
+@pytest.mark.parametrize("ext", ["jsonl", "ndjson"])
+def test_json_lines_source(tmp_path, ext):
+    records = [{"id": i, "name": f"item {i}"} for i in range(5)]
+    path = tmp_path / f"data.{ext}"
+    lines = [json.dumps(r) for r in records]
+    lines.insert(2, "")  # blank lines are skipped
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    source = SourceFactory.make_source(str(path))
+    assert isinstance(source, JsonLinesFileSource)
+    with source as found:
+        assert list(found) == records
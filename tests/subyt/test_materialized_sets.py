@@ -0,0 +1,61 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.api import ReIterableAccess
+from sema.subyt.sets import MaterializedSet
+
+
+class CountingIterable:
+    """Yields records while counting how often it gets iterated"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        return iter({"n": i} for i in range(self.size))
+
+
+@pytest.mark.parametrize("spill_threshold", [None, 3])
+def test_independent_iterations(spill_threshold):
+    source = CountingIterable(10)
+    sets = ReIterableAccess(x=source, spill_threshold=spill_threshold)
+    assert source.passes == 0, "materialization should be lazy"
+
+    expected = [{"n": i} for i in range(10)]
+    # nested loops over the same set, as a per-record template would do
+    for outer in sets["x"]:
+        assert list(sets["x"]) == expected
+    assert list(sets["x"]) == expected
+    assert len(sets["x"]) == 10
+    assert source.passes == 1, "the source should only be read once"
+    sets.close()
+
+
+def test_spill_to_disk_and_cleanup():
+    mset = MaterializedSet(CountingIterable(10), spill_threshold=3)
+    assert len(mset) == 10
+    spill_path = mset._spill_path
+    assert spill_path is not None and Path(spill_path).exists()
+    assert mset._items == [], "spilled records should leave memory"
+    assert list(mset) == [{"n": i} for i in range(10)]
+    mset.close()
+    assert not os.path.exists(spill_path)
+
+
+def test_unpicklable_records_stay_in_memory():
+    records = [{"lock": threading.Lock()} for _ in range(5)]
+    mset = MaterializedSet(records, spill_threshold=2)
+    assert list(mset) == records
+    assert mset._spill_path is None
+
+
+def test_stream_takes_out_set():
+    source = CountingIterable(3)
+    sets = ReIterableAccess(_=source)
+    assert list(sets.stream("_")) == [{"n": i} for i in range(3)]
+    assert "_" not in sets
@@ -0,0 +1,92 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.api import GeneratorSettings, ReIterableAccess
+from sema.subyt.j2.generator import JinjaBasedGenerator
+from sema.subyt.sinks import SinkFactory
+from sema.subyt.sources import SourceFactory
+
+MY_FOLDER = Path(__file__).parent
+TEMPLATES_FOLDER = MY_FOLDER / "templates"
+INPUT_FILE = MY_FOLDER / "in" / "data.csv"
+TEMPLATE_NAME = "01-basic.ttl"
+
+
+def run_generator(sink_id: str, workers: int, chunk_size: int = 2) -> None:
+    generator = JinjaBasedGenerator(str(TEMPLATES_FOLDER))
+    sink = SinkFactory.make_sink(sink_id, force_output=True)
+    generator.process(
+        TEMPLATE_NAME,
+        {"_": SourceFactory.make_source(str(INPUT_FILE))},
+        GeneratorSettings(),
+        sink,
+        vars_dict={"ME": "me"},
+        workers=workers,
+        chunk_size=chunk_size,
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_parallel_single_file_matches_serial(chunk_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_out = Path(tmp) / "serial.ttl"
+        parallel_out = Path(tmp) / "parallel.ttl"
+        run_generator(str(serial_out), workers=1)
+        run_generator(str(parallel_out), workers=2, chunk_size=chunk_size)
+
+        serial = serial_out.read_text()
+        assert "ex:posFirst" in serial and "ex:posLast" in serial
+        assert parallel_out.read_text() == serial
+
+
+def test_parallel_patterned_sink() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        run_generator(str(Path(tmp) / "item-{id}.ttl"), workers=3)
+        found = sorted(p.name for p in Path(tmp).iterdir())
+        with SourceFactory.make_source(str(INPUT_FILE)) as records:
+            expected = sorted(f"item-{r['id']}.ttl" for r in records)
+        assert found == expected
+
+
+def test_parallel_sets_released(tmp_path: Path, monkeypatch) -> None:
+    # sets spilled to disk by the workers are removed when they end
+    spill_folder = tmp_path / "spill"
+    spill_folder.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(spill_folder))
+    monkeypatch.setitem(
+        ReIterableAccess.__init__.__kwdefaults__, "spill_threshold", 5
+    )
+    (tmp_path / "tpl.txt").write_text("{{ _.id }}:{{ sets.x | length }};")
+    data = tmp_path / "data.csv"
+    data.write_text("id\n" + "".join(f"{n}\n" for n in range(20)))
+    out = tmp_path / "out.txt"
+    JinjaBasedGenerator(str(tmp_path)).process(
+        "tpl.txt",
+        {
+            "_": SourceFactory.make_source(data),
+            "x": SourceFactory.make_source(data),
+        },
+        GeneratorSettings(),
+        SinkFactory.make_sink(str(out)),
+        workers=2,
+    )
+    assert out.read_text() == "".join(f"{n}:20;" for n in range(20))
+    assert list(spill_folder.iterdir()) == []
+
+
+def test_parallel_reading_base_set(tmp_path: Path) -> None:
+    # templates reading the base set as a whole are rendered sequentially
+    (tmp_path / "tpl.txt").write_text("{{ _.id }}:{{ sets._ | length }};")
+    data = tmp_path / "data.csv"
+    data.write_text("id\n" + "".join(f"{n}\n" for n in range(3)))
+    out = tmp_path / "out.txt"
+    JinjaBasedGenerator(str(tmp_path)).process(
+        "tpl.txt",
+        {"_": SourceFactory.make_source(data)},
+        GeneratorSettings(),
+        SinkFactory.make_sink(str(out)),
+        workers=2,
+    )
+    assert out.read_text() == "0:3;1:3;2:3;"
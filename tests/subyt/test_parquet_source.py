@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.sources import SourceFactory
+from sema.subyt.subyt import Subyt
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+ROWS = 25
+
+
+@pytest.fixture()
+def parquet_file(tmp_path: Path) -> Path:
+    table = pa.table(
+        {
+            "id": list(range(ROWS)),
+            "name": [f"name-{i}" for i in range(ROWS)],
+            "wide": ["x" * 100] * ROWS,
+        }
+    )
+    path = tmp_path / "data.parquet"
+    pq.write_table(table, path, row_group_size=10)
+    return path
+
+
+def test_parquet_source(parquet_file: Path):
+    source = SourceFactory.make_source(f"{parquet_file}+batch_size=4")
+    assert type(source).__name__ == "ParquetFileSource"
+    with source as records:
+        records = list(records)
+    assert len(records) == ROWS
+    assert records[3] == {"id": 3, "name": "name-3", "wide": "x" * 100}
+
+
+def test_parquet_projection(parquet_file: Path):
+    source = SourceFactory.make_source(f"{parquet_file}+columns=id,wide")
+    with source as records:
+        assert next(iter(records)) == {"id": 0, "wide": "x" * 100}
+    source.project({"id", "name", "unknown"})
+    with source as records:
+        assert next(iter(records)) == {"id": 0}, "columns still apply"
+
+    # decorators add the fields they need themselves
+    source = SourceFactory.make_source(
+        {"path": parquet_file, "index": "name"}, unique_pattern="{wide}"
+    )
+    source.project({"id"})
+    with source as records:
+        first = next(iter(records))
+    assert first == {"id": 0, "name": "name-0", "wide": "x" * 100}
+
+
+def test_parquet_projection_from_template(tmp_path: Path, parquet_file: Path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "tpl.txt").write_text("{{ _.name }} {{ _.keys() | list }}")
+    Subyt(
+        template_name="tpl.txt",
+        template_folder=str(templates),
+        source=str(parquet_file),
+        sink=str(tmp_path / "out" / "{id}.txt"),
+        break_on_error=True,
+    ).process()
+    # _.keys() passes the record as a whole: no projection
+    assert (tmp_path / "out" / "0.txt").read_text().count("wide") == 1
+
+    (templates / "tpl.txt").write_text("{{ _.name }}")
+    Subyt(
+        template_name="tpl.txt",
+        template_folder=str(templates),
+        source=str(parquet_file),
+        sink=str(tmp_path / "out2" / "{id}.txt"),
+        break_on_error=True,
+    ).process()
+    assert (tmp_path / "out2" / "7.txt").read_text() == "name-7"
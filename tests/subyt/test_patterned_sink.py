@@ -0,0 +1,115 @@
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.sinks import PatternedFileSink
+from sema.subyt.subyt import Subyt
+
+SUBYT_TEST_FOLDER = Path(__file__).absolute().parent
+
+
+def items(n: int, folders: int = 3):
+    return [{"folder": f"f{i % folders}", "id": i} for i in range(n)]
+
+
+@pytest.mark.parametrize("writers", [0, 4])
+def test_many_files(tmp_path: Path, writers: int):
+    sink = PatternedFileSink(
+        str(tmp_path / "{folder}" / "{id}.txt"), writers=writers
+    )
+    sink.open()
+    for item in items(500):
+        sink.add(f"part {item['id']}", item)
+    sink.close()
+    written = sorted(tmp_path.glob("*/*.txt"))
+    assert len(written) == 500
+    assert (tmp_path / "f1" / "7.txt").read_text() == "part 7"
+    assert len(sink._created_folders) == 3, "folders should be created once"
+
+
+@pytest.mark.parametrize("writers", [0, 2])
+def test_repeated_paths(tmp_path: Path, writers: int):
+    sink = PatternedFileSink(
+        str(tmp_path / "{id}.txt"), True, True, writers=writers
+    )
+    sink.open()
+    for n in range(3):
+        sink.add(f"part {n}", {"id": "same"})
+    sink.close()
+    assert (tmp_path / "same.txt").read_text() == "part 0"
+    assert (tmp_path / "same.txt_0").read_text() == "part 1"
+    assert (tmp_path / "same.txt_1").read_text() == "part 2"
+
+    sink = PatternedFileSink(str(tmp_path / "{id}.txt"), True)
+    sink.open()
+    sink.add("once", {"id": "other"})
+    with pytest.raises(RuntimeError):
+        sink.add("twice", {"id": "other"})
+    sink.close()
+
+
+def test_background_write_errors(tmp_path: Path):
+    (tmp_path / "existing.txt").write_text("original")
+    sink = PatternedFileSink(str(tmp_path / "{id}.txt"), False, writers=2)
+    sink.open()
+    with pytest.raises(AssertionError):
+        sink.add("new", {"id": "existing"})
+    sink.close()
+    assert (tmp_path / "existing.txt").read_text() == "original"
+
+    # failures in the writer threads are raised, at the latest on close
+    (tmp_path / "blocked").write_text("not a folder")
+    sink = PatternedFileSink(
+        str(tmp_path / "{folder}" / "{id}.txt"), True, writers=2
+    )
+    sink.open()
+    sink._created_folders.add((tmp_path / "blocked").absolute())
+    sink.add("part", {"folder": "blocked", "id": "x"})
+    with pytest.raises(NotADirectoryError):
+        sink.close()
+
+
+@pytest.mark.parametrize("extension", [".zip", ".tar", ".tar.gz"])
+def test_archive_output(tmp_path: Path, extension: str):
+    archive = tmp_path / f"out{extension}"
+    sink = PatternedFileSink(
+        "data/{folder}/{id}.txt", writers=2, archive=str(archive)
+    )
+    sink.open()
+    for item in items(10):
+        sink.add(f"part {item['id']}", item)
+    sink.close()
+    assert not Path("data/f0").exists(), "no individual files expected"
+    if extension == ".zip":
+        with zipfile.ZipFile(archive) as zf:
+            names = zf.namelist()
+            assert zf.read("data/f1/4.txt") == b"part 4"
+    else:
+        with tarfile.open(archive) as tf:
+            names = tf.getnames()
+            assert tf.extractfile("data/f1/4.txt").read() == b"part 4"
+    assert len(names) == 10
+
+
+def test_unsupported_archive(tmp_path: Path):
+    sink = PatternedFileSink("{id}.txt", archive=str(tmp_path / "out.rar"))
+    with pytest.raises(ValueError):
+        sink.open()
+
+
+def test_subyt_archive(tmp_path: Path):
+    archive = tmp_path / "out.zip"
+    Subyt(
+        source=str(SUBYT_TEST_FOLDER / "resources/data.csv"),
+        sink="{key}.ttl",
+        template_name="data.ttl.j2",
+        template_folder=str(SUBYT_TEST_FOLDER / "resources"),
+        archive=str(archive),
+        writers=1,
+        break_on_error=True,
+    ).process()
+    with zipfile.ZipFile(archive) as zf:
+        assert len(zf.namelist()) > 0
+        assert all(name.endswith(".ttl") for name in zf.namelist())
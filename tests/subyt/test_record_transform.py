@@ -0,0 +1,103 @@
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.api import GeneratorSettings
+from sema.subyt.records import Record, RecordTransformer, lookup_path
+from sema.subyt.subyt import Subyt
+
+
+def test_ignorecase_records():
+    transformer = RecordTransformer(flatten=False, ignorecase=True)
+    one = transformer.apply({"Name": "one", "ID": 1})
+    two = transformer.apply({"Name": "two", "ID": 2})
+    assert isinstance(one, Record)
+    assert list(one) == ["Name", "ID"], "keys are kept as is"
+    assert one["name"] == "one" and one["NAME"] == "one" and one["Name"]
+    assert two.get("id") == 2 and two.get("other", "-") == "-"
+    with pytest.raises(KeyError):
+        one["other"]
+    assert one._by_lower is two._by_lower, "lookup built once per key-set"
+    copy = pickle.loads(pickle.dumps(one))
+    assert copy == one and copy["id"] == 1
+
+
+def test_flatten_records():
+    record = {"id": 1, "meta": {"Source": "x", "geo": {"lat": 5}}}
+    assert lookup_path(record, "meta.geo.lat") == (True, 5)
+    assert lookup_path(record, "meta.source") == (False, None)
+    assert lookup_path(record, "meta.source", True) == (True, "x")
+    assert lookup_path(record, "id.x") == (False, None)
+
+    transformer = RecordTransformer(flatten=True, ignorecase=False)
+    flat = transformer.apply(record)
+    assert flat["meta.Source"] == "x" and flat["meta.geo.lat"] == 5
+    assert flat["meta"] is record["meta"], "nested records are kept"
+    assert flat.get("meta.source") is None
+    assert "meta.Source" not in flat, "flattened keys are not added"
+    assert pickle.loads(pickle.dumps(flat))["meta.geo.lat"] == 5
+
+    transformer = RecordTransformer(flatten=True, ignorecase=True)
+    assert transformer.apply(record)["META.source"] == "x"
+    # actual keys holding the separator go first
+    assert transformer.apply({"a.b": 1, "a": {"b": 2}})["a.b"] == 1
+    assert transformer.apply({"a": {"b": 2}})["a.b"] == 2
+    wrapped = ["not", "a", "dict"]
+    assert transformer.apply(wrapped) is wrapped
+
+
+def test_from_settings():
+    assert RecordTransformer.from_settings(GeneratorSettings()) is not None
+    settings = GeneratorSettings("no-fl,no-ig")
+    assert RecordTransformer.from_settings(settings) is None
+
+
+def run(
+    tmp_path: Path, template: str, source: Path, mode: str, workers: int = 1
+) -> str:
+    (tmp_path / "tpl.txt").write_text(template)
+    out = tmp_path / "out.txt"
+    Subyt(
+        template_name="tpl.txt",
+        template_folder=str(tmp_path),
+        source=str(source),
+        sink=str(out),
+        mode=mode,
+        workers=workers,
+        break_on_error=True,
+    ).process()
+    return out.read_text()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_subyt_modes(tmp_path: Path, workers: int):
+    source = tmp_path / "data.json"
+    records = [{"Id": n, "meta": {"Name": f"n{n}"}} for n in range(3)]
+    source.write_text(json.dumps(records))
+    template = "{{ _.id }}={{ _['meta.name'] }};"
+    result = run(tmp_path, template, source, "it", workers)
+    assert result == "0=n0;1=n1;2=n2;"
+    assert run(tmp_path, template, source, "it,no-ig", workers) == "=;=;=;"
+    template = "{% for r in sets['_'] %}{{ r['meta.Name'] }}{% endfor %}"
+    assert run(tmp_path, template, source, "no-it") == "n0n1n2"
+    assert run(tmp_path, template, source, "no-it,no-fl") == ""
+
+
+def test_projection_ignoring_case(tmp_path: Path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    source = tmp_path / "data.parquet"
+    table = pa.table({"Name": ["a", "b"], "Other": [1, 2]})
+    pq.write_table(table, source)
+    assert run(tmp_path, "{{ _.name }};", source, "it") == "a;b;"
+
+
+def test_nested_records_unchanged(tmp_path: Path):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps([{"id": 1, "meta": {"a": 2}}]))
+    template = "{{ _ | tojson }}|{% for k in _ %}{{ k }};{% endfor %}"
+    expected = '{"id": 1, "meta": {"a": 2}}|id;meta;'
+    assert run(tmp_path, template, source, "it") == expected
+    assert run(tmp_path, template, source, "it,no-fl,no-ig") == expected
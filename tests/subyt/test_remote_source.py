@@ -0,0 +1,86 @@
+import os
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+from threading import Thread
+
+import pytest
+
+from sema.subyt.sources import RemoteSource, SourceFactory
+
+CSV_CONTENT = "id,name\n1,one\n2,two\n"
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    """Serves files, remembering the response status codes"""
+
+    statuses: list = []
+
+    def send_response(self, code, message=None):
+        RecordingHandler.statuses.append(code)
+        super().send_response(code, message)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def served_folder(tmp_path: Path):
+    docroot = tmp_path / "docroot"
+    docroot.mkdir()
+    handler = partial(RecordingHandler, directory=str(docroot))
+    RecordingHandler.statuses = []
+    with HTTPServer(("127.0.0.1", 0), handler) as httpd:
+        Thread(target=httpd.serve_forever, daemon=True).start()
+        ip, port = httpd.server_address
+        yield docroot, f"http://{ip}:{port}/"
+        httpd.shutdown()
+
+
+def test_remote_csv_source(served_folder, tmp_path):
+    docroot, base = served_folder
+    csv_file = docroot / "data.csv"
+    csv_file.write_text(CSV_CONTENT)
+    os.utime(csv_file, (1_000_000_000, 1_000_000_000))
+    cache = tmp_path / "cache"
+    identifier = {"identifier": f"{base}data.csv", "cache": str(cache)}
+
+    source = SourceFactory.make_source(dict(identifier))
+    assert isinstance(source, RemoteSource)
+    assert RecordingHandler.statuses == [], "only fetched when used"
+    with source as records:
+        assert list(records) == [
+            {"id": "1", "name": "one"},
+            {"id": "2", "name": "two"},
+        ]
+    assert RecordingHandler.statuses == [200]
+    assert source.mtimes == {f"{base}data.csv": 1_000_000_000}
+
+    # a second source revalidates the cache, not downloading again
+    source = SourceFactory.make_source(dict(identifier))
+    assert source.mtimes == {f"{base}data.csv": 1_000_000_000}
+    assert RecordingHandler.statuses == [200, 304]
+    with source as records:
+        assert len(list(records)) == 2
+    assert RecordingHandler.statuses == [200, 304], "fetched once"
+
+    # changed content is fetched again
+    csv_file.write_text(CSV_CONTENT + "3,three\n")
+    source = SourceFactory.make_source(dict(identifier), shard="0/1")
+    assert source.mtimes[f"{base}data.csv"] > 1_000_000_000
+    assert RecordingHandler.statuses == [200, 304, 200]
+    with source as records:
+        assert len(list(records)) == 3
+
+
+def test_remote_source_failure(served_folder, tmp_path):
+    docroot, base = served_folder
+    identifier = {"identifier": f"{base}missing.csv", "cache": str(tmp_path)}
+    source = SourceFactory.make_source(dict(identifier))
+    with pytest.raises(ValueError):
+        with source:
+            pass
+    # unless a fake empty source is requested
+    source = SourceFactory.make_source(dict(identifier), fake_empty=True)
+    with source as records:
+        assert list(records) == []
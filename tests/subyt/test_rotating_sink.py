@@ -0,0 +1,91 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from rdflib import Graph
+
+from sema.subyt import JinjaBasedGenerator
+from sema.subyt.compression import inner_name, open_text_reader
+from sema.subyt.sinks import RotatingFileSink, SingleFileSink, SinkFactory
+from sema.subyt.subyt import Subyt
+
+SUBYT_TEST_FOLDER = Path(__file__).absolute().parent
+TEMPLATES_FOLDER = SUBYT_TEST_FOLDER / "templates"
+
+
+def test_factory_rotating(tmp_path: Path):
+    pattern = str(tmp_path / "out-{part}.ttl.gz")
+    sink = SinkFactory.make_sink(pattern, rotate_records=10)
+    assert isinstance(sink, RotatingFileSink)
+    # without a {part} pattern, rotation is ignored
+    sink = SinkFactory.make_sink(str(tmp_path / "out.ttl"), rotate_bytes=10)
+    assert isinstance(sink, SingleFileSink)
+
+
+@pytest.mark.parametrize("suffix", ["", ".gz", ".bz2", ".xz"])
+def test_compressed_single_file(tmp_path: Path, suffix: str):
+    out = tmp_path / f"out.txt{suffix}"
+    sink = SingleFileSink(str(out))
+    sink.open()
+    for n in range(100):
+        sink.add(f"line {n}\n")
+    sink.close()
+    assert inner_name(out) == "out.txt"
+    with open_text_reader(out) as f:
+        assert f.read().splitlines()[99] == "line 99"
+
+
+def test_rotate_by_records_and_bytes(tmp_path: Path):
+    sink = RotatingFileSink(str(tmp_path / "p{part}.txt"), rotate_records=3)
+    sink.set_header("# header")
+    sink.open()
+    for n in range(7):
+        sink.add(f"{n}\n")
+    sink.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "p0.txt",
+        "p1.txt",
+        "p2.txt",
+    ]
+    assert (tmp_path / "p0.txt").read_text() == "0\n1\n2\n"
+    assert (tmp_path / "p1.txt").read_text() == "# header\n3\n4\n5\n"
+    assert (tmp_path / "p2.txt").read_text() == "# header\n6\n"
+
+    sink = RotatingFileSink(str(tmp_path / "b{part}.txt"), rotate_bytes=10)
+    sink.open()
+    for n in range(6):
+        sink.add("abcd\n")
+    sink.close()
+    assert len(list(tmp_path.glob("b*.txt"))) == 3
+
+
+def test_header_block():
+    generator = JinjaBasedGenerator(str(TEMPLATES_FOLDER))
+    header = generator.render_header(
+        "extra/header-block.ttl", {"base": "http://example.org/"}
+    )
+    assert header.strip() == "@prefix ex: <http://example.org/> ."
+    assert generator.render_header("01-basic.ttl") is None
+
+
+@pytest.mark.parametrize("batch_size", [0, 3])
+def test_subyt_rotating_parts(tmp_path: Path, batch_size: int):
+    Subyt(
+        source=str(SUBYT_TEST_FOLDER / "resources/data.csv"),
+        sink=str(tmp_path / "out-{part}.ttl.gz"),
+        template_name="extra/header-block.ttl",
+        template_folder=str(TEMPLATES_FOLDER),
+        variables={"base": "http://example.org/"},
+        rotate_records=2,
+        batch_size=batch_size,
+        break_on_error=True,
+    ).process()
+    parts = sorted(tmp_path.glob("out-*.ttl.gz"))
+    assert len(parts) == 2
+    total = 0
+    for part in parts:
+        with gzip.open(part, "rt", encoding="utf-8") as f:
+            g = Graph().parse(data=f.read(), format="turtle")
+        assert len(g) == 2, f"{part.name} should parse on its own"
+        total += len(g)
+    assert total == 4
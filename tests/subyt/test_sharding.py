@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.__main__ import _main
+from sema.subyt.sinks import ShardFileSink, shard_path
+from sema.subyt.sources import (
+    ShardingSource,
+    SourceFactory,
+    parse_shard,
+    shard_of,
+)
+from sema.subyt.subyt import Subyt
+
+TEMPLATE = (
+    "{% if ctrl.isFirst %}{% block header %}@prefix ex: <{{ base }}> .\n"
+    "{% endblock %}{% endif %}"
+    "ex:{{ _.id }} ex:name '{{ _.name }}' .\n"
+    "{% if ctrl.isLast %}{% block footer %}# end\n{% endblock %}{% endif %}"
+)
+
+
+def write_data(tmp_path: Path, rows: int) -> Path:
+    data = tmp_path / "data.csv"
+    data.write_text("id,name\n" + "".join(f"{n},n{n}\n" for n in range(rows)))
+    return data
+
+
+def run(tmp_path: Path, data: Path, out: Path, **kwargs) -> None:
+    (tmp_path / "tpl.ttl").write_text(TEMPLATE)
+    Subyt(
+        template_name="tpl.ttl",
+        template_folder=str(tmp_path),
+        source=str(data),
+        sink=str(out),
+        variables=dict(base="https://example.org/"),
+        break_on_error=True,
+        **kwargs,
+    ).process()
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (1, 4)
+    assert parse_shard(" 0 / 1 ") == (0, 1)
+    for spec in ("4/4", "1", "a/b", "-1/2"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+    assert shard_path("out/data.ttl.gz", 1, 3) == str(
+        Path("out/data.shard-1-of-3.ttl.gz")
+    )
+
+
+@pytest.mark.parametrize("key_pattern", [None, "{name}"])
+def test_shards_cover_all(tmp_path: Path, key_pattern: str | None):
+    data = write_data(tmp_path, 50)
+    found = list()
+    for shard in range(3):
+        source = ShardingSource(
+            SourceFactory.make_source(data), shard, 3, key_pattern
+        )
+        with source as records:
+            taken = [r["id"] for r in records]
+        assert source.taken == len(taken)
+        if key_pattern is not None:
+            assert all(shard_of(f"n{i}", 3) == shard for i in taken)
+        found.extend(taken)
+    assert sorted(found, key=int) == [str(n) for n in range(50)]
+
+
+@pytest.mark.parametrize("rows", [7, 2, 0])
+def test_shard_and_merge(tmp_path: Path, rows: int):
+    data = write_data(tmp_path, rows)
+    expected = tmp_path / "expected.ttl"
+    run(tmp_path, data, expected)
+    out = tmp_path / "out" / "data.ttl"
+    for shard in range(4):
+        run(tmp_path, data, out, shard=f"{shard}/4")
+        assert Path(shard_path(out, shard, 4)).exists()
+    with pytest.raises(ValueError):
+        ShardFileSink.merge(out, 5)
+    ShardFileSink.merge(out, 4)
+    merged = out.read_text()
+    if rows == 0:
+        assert merged == expected.read_text()
+        return
+    assert merged.startswith("@prefix ex: <https://example.org/> .\n")
+    assert merged.endswith("# end\n") and merged.count("@prefix") == 1
+    lines = merged.splitlines()
+    assert sorted(lines) == sorted(expected.read_text().splitlines())
+
+
+def test_cli_shards(tmp_path: Path):
+    data = write_data(tmp_path, 10)
+    (tmp_path / "tpl.ttl").write_text(TEMPLATE)
+    out = tmp_path / "data.ttl"
+    for shard in range(2):
+        cli_line = (
+            f"--templates {tmp_path} --name tpl.ttl --input {data}"
+            f" --output {out} --var base urn:x: --shard {shard}/2"
+            " --shard-key {id}"
+        )
+        assert _main(*cli_line.split())
+    assert not out.exists()
+    assert _main(*f"--output {out} --merge-shards 2".split())
+    assert out.read_text().count("ex:name") == 10
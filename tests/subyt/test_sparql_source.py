@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.sources import SourceFactory, SPARQLSource
+from sema.subyt.subyt import Subyt
+
+TTL = """
+@prefix ex: <http://example.org/> .
+ex:a ex:name "a" ; ex:size 1 .
+ex:b ex:name "b" ; ex:size 2 .
+ex:c ex:name "c" .
+"""
+QUERY = (
+    "PREFIX ex: <http://example.org/> "
+    "SELECT ?name ?size WHERE { ?s ex:name ?name . "
+    "OPTIONAL { ?s ex:size ?size } } ORDER BY ?name"
+)
+
+
+@pytest.fixture()
+def ttl_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data.ttl"
+    path.write_text(TTL)
+    return path
+
+
+@pytest.mark.parametrize("page_size", [0, 2, 10])
+def test_sparql_file_source(ttl_file: Path, page_size: int):
+    source = SourceFactory.make_source(
+        f"sparql+file:{ttl_file}+query={QUERY}+page_size={page_size}"
+    )
+    assert isinstance(source, SPARQLSource)
+    assert source.mtimes == {str(ttl_file): ttl_file.stat().st_mtime}
+    with source as records:
+        assert list(records) == [
+            {"name": "a", "size": 1},
+            {"name": "b", "size": 2},
+            {"name": "c", "size": None},
+        ]
+
+
+def test_sparql_template_source(ttl_file: Path):
+    source = SourceFactory.make_source(
+        f"sparql+file://{ttl_file}+template=all.sparql+var.N=2"
+    )
+    with source as records:
+        assert len(list(records)) == 2
+    with pytest.raises(ValueError):
+        SourceFactory.make_source(f"sparql+file:{ttl_file}")  # no query
+
+
+def test_subyt_sparql(tmp_path: Path, ttl_file: Path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "tpl.txt").write_text("{{ _.name }}={{ _.size }};")
+    out = tmp_path / "out.txt"
+    Subyt(
+        template_name="tpl.txt",
+        template_folder=str(templates),
+        source={"identifier": f"sparql+file:{ttl_file}", "query": QUERY},
+        sink=str(out),
+        break_on_error=True,
+    ).process()
+    assert out.read_text() == "a=1;b=2;c=None;"
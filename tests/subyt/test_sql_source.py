@@ -0,0 +1,87 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from sema.subyt.sources import SourceFactory, SQLSource
+from sema.subyt.subyt import Subyt
+
+
+@pytest.fixture()
+def database(tmp_path: Path) -> Path:
+    db_path = tmp_path / "data.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "CREATE TABLE item (id INTEGER, name TEXT, changed TEXT)"
+        )
+        connection.executemany(
+            "INSERT INTO item VALUES (?, ?, ?)",
+            [(i, f"name-{i}", f"2024-01-{i + 1:02d}") for i in range(10)],
+        )
+    connection.close()
+    return db_path
+
+
+def test_sql_source(database: Path):
+    url = f"sqlite:///{database}"  # absolute path: four slashes
+    source = SourceFactory.make_source(
+        f"{url}+query=SELECT id, name FROM item WHERE id >= 5+batch_size=2"
+    )
+    assert isinstance(source, SQLSource)
+    assert source.mtimes == {str(database): database.stat().st_mtime}
+    with source as records:
+        assert list(records) == [
+            {"id": i, "name": f"name-{i}"} for i in range(5, 10)
+        ]
+
+    source = SourceFactory.make_source(
+        {
+            "identifier": url,
+            "table": "item",
+            "mtime_query": "SELECT max(changed) FROM item",
+        }
+    )
+    assert source.mtimes == {url: datetime(2024, 1, 10).timestamp()}
+    with source as records:
+        assert len(list(records)) == 10
+
+
+def test_sql_table_quoted(database: Path):
+    assert SQLSource.quote_table("item") == '"item"'
+    assert SQLSource.quote_table("main.item") == '"main"."item"'
+    assert SQLSource.quote_table('a"b') == '"a""b"'
+    url = f"sqlite:///{database}"
+    source = SourceFactory.make_source(dict(identifier=url, table="main.item"))
+    with source as records:
+        assert len(list(records)) == 10
+    # not read as sql, just as (unknown) table name
+    table = "item WHERE id < 0; --"
+    source = SourceFactory.make_source(dict(identifier=url, table=table))
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        with source as records:
+            list(records)
+
+
+def test_sql_source_errors(tmp_path: Path, database: Path):
+    with pytest.raises(ValueError):
+        SourceFactory.make_source(f"sqlite:///{database}")  # no query
+    with pytest.raises(ValueError):
+        SourceFactory.make_source(
+            f"sqlite:///{tmp_path}/missing.db+table=item"
+        )
+
+
+def test_subyt_sql(tmp_path: Path, database: Path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "tpl.txt").write_text("{{ _.id }}:{{ _.name }};")
+    out = tmp_path / "out.txt"
+    Subyt(
+        template_name="tpl.txt",
+        template_folder=str(templates),
+        source=f"sqlite:///{database}+table=item",
+        sink=str(out),
+        break_on_error=True,
+    ).process()
+    assert out.read_text().split(";")[9] == "9:name-9"
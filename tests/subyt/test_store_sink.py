@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from sema.commons.store import MemoryRDFStore, URIRDFStore
+from sema.subyt import GeneratorSettings, JinjaBasedGenerator
+from sema.subyt.sinks import SinkFactory, StoreSink
+from sema.subyt.sources import SourceFactory
+
+SUBYT_TEST_FOLDER = Path(__file__).absolute().parent
+GRAPH = "urn:test:subyt"
+PREFIXES = "@prefix ex: <http://example.org/> .\n"
+
+
+def triples_in(store: MemoryRDFStore) -> int:
+    result = store.select("SELECT (count(*) as ?n) WHERE { ?s ?p ?o }", GRAPH)
+    return int(next(iter(result))[0])
+
+
+def test_store_sink_batches(monkeypatch):
+    store = MemoryRDFStore()
+    inserts = []
+
+    def insert(graph, named_graph):
+        inserts.append(len(graph))
+        MemoryRDFStore.insert(store, graph, named_graph)
+
+    monkeypatch.setattr(store, "insert", insert)
+    sink = StoreSink(store, GRAPH, batch_size=4)
+    assert sink.mtimes == {".": 0.0}, "no lastmod for a new graph"
+    sink.open()
+    sink.add(PREFIXES + 'ex:i0 ex:n 0 ; ex:m "0" .\n')
+    for i in range(1, 5):
+        # later parts rely on the prefixes declared in the first
+        sink.add(f'ex:i{i} ex:n {i} ; ex:m "{i}" .\n')
+    sink.add("<http://example.org/x> <http://example.org/n> 5 .\n")
+    sink.close()
+    assert inserts == [4, 4, 3]
+    assert triples_in(store) == 11
+
+    # existing graphs are only replaced when forced
+    sink = StoreSink(store, GRAPH)
+    assert GRAPH in sink.mtimes
+    with pytest.raises(AssertionError):
+        sink.open()
+    sink = StoreSink(store, GRAPH, force_output=True)
+    sink.open()
+    sink.add(PREFIXES + "ex:a ex:b ex:c .")
+    sink.close()
+    assert triples_in(store) == 1
+
+
+def test_store_sink_from_identifier(monkeypatch):
+    monkeypatch.setattr(URIRDFStore, "lastmod_ts", lambda self, ng: None)
+    sink = SinkFactory.make_sink("sparql+http://localhost:7200/sparql#urn:g")
+    assert isinstance(sink, StoreSink)
+    assert sink._named_graph == "urn:g"
+    with pytest.raises(AssertionError):
+        SinkFactory.make_sink("sparql+http://localhost:7200/sparql")
+
+
+def test_generate_into_store():
+    store = MemoryRDFStore()
+    sink = StoreSink(store, GRAPH)
+    resources = SUBYT_TEST_FOLDER / "resources"
+    JinjaBasedGenerator(str(resources)).process(
+        "data.ttl.j2",
+        {"_": SourceFactory.make_source(str(resources / "data.csv"))},
+        GeneratorSettings("it"),
+        sink,
+    )
+    assert triples_in(store) == 8
@@ -7,6 +7,12 @@ from rdflib import Graph, URIRef
 from sema.commons.glob import getMatchingGlobPaths
 from sema.subyt.__main__ import _main
 from sema.subyt.api import Source
+from sema.subyt.dedupe import (
+    BLOOM_CAPACITY,
+    BloomSeenKeys,
+    DiskSeenKeys,
+    SeenKeys,
+)
 from sema.subyt.sources import CSVFileSource, FilteringSource, SourceFactory
 from tests.conftest import log
 
@@ -146,3 +152,67 @@ def test_unique_processing() -> None:
                 )
                 assert len(found_names) == 1
                 assert found_names[0].value == expected_names[i]
+
+
+class RepeatingSource(Source):
+    def __init__(self, records: int, keys: int) -> None:
+        self._records, self._keys = records, keys
+
+    def __enter__(self) -> object:
+        return ({"key": n % self._keys} for n in range(self._records))
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+@pytest.mark.parametrize("dedupe", [None, "memory", "disk", "bloom:1000"])
+def test_dedupe_kinds(dedupe: str | None) -> None:
+    # long runs of duplicates are skipped without recursion
+    upfs = FilteringSource(RepeatingSource(5_000, 10), "{key}", dedupe)
+    with upfs as items:
+        assert [item["key"] for item in items] == list(range(10))
+    assert upfs.passed == 10
+    assert upfs.skipped == 5_000 - 10
+    assert upfs._stores == [], "stores are closed on exit"
+
+
+def test_seen_keys() -> None:
+    disk = SeenKeys.make("disk")
+    assert isinstance(disk, DiskSeenKeys)
+    assert disk.add("a") and not disk.add("a") and disk.add("b")
+    path = Path(disk._path)
+    assert path.exists()
+    disk.close()
+    assert not path.exists()
+
+    with pytest.raises(ValueError):
+        SeenKeys.make("tape")
+    with pytest.raises(ValueError):
+        FilteringSource(FixedDataListSource(), "{name}", "tape")
+    assert SeenKeys.parse(None) == ("memory", None)
+    assert SeenKeys.parse("bloom") == ("bloom", BLOOM_CAPACITY)
+    assert SeenKeys.parse("bloom:500") == ("bloom", 500)
+    for dedupe in ("bloom:0", "bloom:x", "disk:1", "memory:x"):
+        with pytest.raises(ValueError):
+            SeenKeys.parse(dedupe)
+
+    bloom = SeenKeys.make("bloom:10000")
+    assert isinstance(bloom, BloomSeenKeys)
+    added = sum(bloom.add(f"key-{n}") for n in range(10_000))
+    assert added > 10_000 * 0.99, "few false positives within capacity"
+    assert not any(bloom.add(f"key-{n}") for n in range(10_000))
+
+
+@pytest.mark.parametrize("dedupe", [None, "disk"])
+def test_filtered_folder_source(tmp_path: Path, dedupe: str | None) -> None:
+    # the files of a folder are read once, with one store of seen keys
+    for name, start in (("a.csv", 0), ("b.csv", 3)):
+        rows = "".join(f"{n}\n" for n in range(start, start + 5))
+        (tmp_path / name).write_text("id\n" + rows)
+    upfs = FilteringSource(SourceFactory.make_source(tmp_path), "{id}", dedupe)
+    with upfs as items:
+        assert iter(items) is items
+        assert [item["id"] for item in items] == [str(n) for n in range(8)]
+        assert len(upfs._stores) == 1
+    assert upfs.passed == 8
+    assert upfs.skipped == 2
@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import pytest
+import xmlasdict
+
+from sema.subyt.sources import SourceFactory, XMLFileSource
+from sema.subyt.xmlstream import RecordPath
+
+MY_FOLDER = Path(__file__).parent
+DATA_FOLDER = MY_FOLDER / "in"
+
+
+def unpacked(path: Path) -> list:
+    """the reference behaviour: parse all, then unpack"""
+    return [w.dumps() for w in xmlasdict.parse(str(path)).unpack()]
+
+
+def streamed(identifier: str | dict) -> list:
+    source = SourceFactory.make_source(identifier)
+    assert isinstance(source, XMLFileSource)
+    with source as records:
+        return [w.dumps() for w in records]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "<a><b><c x='1'>one</c><c>two</c><c>three</c></b></a>",
+        "<a><b><c>one</c></b></a>",
+        "<a><b><c>one</c><d>two</d></b></a>",
+        "<a><b/></a>",
+        "<a/>",
+        "<a><b><c>1</c><c>2</c></b><b><c>3</c></b></a>",
+        "<a xmlns='urn:x'><b><c>1</c><c>2</c></b></a>",
+        "<a xmlns='http://x.org/ns/'><b><c>1</c><c>2</c></b></a>",
+    ],
+)
+def test_streaming_matches_unpack(tmp_path, content):
+    path = tmp_path / "data.xml"
+    path.write_text(content, encoding="utf-8")
+    assert streamed(str(path)) == unpacked(path)
+
+
+def test_movies_source():
+    path = DATA_FOLDER / "data_movies.xml"
+    found = streamed(str(path))
+    assert found == unpacked(path)
+    assert len(found) == 3
+
+
+def test_namespaced_records(tmp_path):
+    path = tmp_path / "eml.xml"
+    path.write_text(
+        "<eml:eml xmlns:eml='https://eml.ecoinformatics.org/eml-2.2.0'>"
+        "<dataset><title>t</title></dataset>"
+        "<dataset><title>u</title></dataset></eml:eml>",
+        encoding="utf-8",
+    )
+    found = streamed(str(path))
+    assert len(found) == 2 and found == unpacked(path)
+
+
+def test_record_path_config(tmp_path):
+    path = tmp_path / "data.xml"
+    path.write_text(
+        "<root><meta><item>not me</item></meta>"
+        "<dataset><item id='1'><item>nested</item></item>"
+        "<item id='2'/></dataset></root>",
+        encoding="utf-8",
+    )
+    source = SourceFactory.make_source(f"{path}+record=//dataset/item")
+    with source as records:
+        found = [(r["@id"], r._node.tag) for r in records]
+    assert found == [("1", "item"), ("2", "item")]
+
+
+@pytest.mark.parametrize(
+    "path, tags, expected",
+    [
+        ("//b/c", ["a", "b", "c"], True),
+        ("//c", ["a", "b", "c"], True),
+        ("//b", ["a", "b", "c"], False),
+        ("/a/b/c", ["a", "b", "c"], True),
+        ("/b/c", ["a", "b", "c"], False),
+        ("b/c", ["a", "b", "c"], True),
+        ("b/*", ["a", "b", "c"], True),
+        ("b/c", ["a", "{urn:x}b", "c"], True),
+        ("/{http://x/y}a/b", ["{http://x/y}a", "{http://x/y}b"], True),
+        ("/{http://x/y}a/b", ["{http://x/z}a", "{http://x/y}b"], False),
+    ],
+)
+def test_record_path_matching(path, tags, expected):
+    assert RecordPath(path).matches(tags) == expected